@@ -1,39 +1,293 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import math
 import os
 import sys
 import json
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from plexapi.server import PlexServer
 import plexapi.exceptions
 import time
 import re
+import sqlite3
 import customtkinter as ctk
 import tkinter as tk
 import threading
+import asyncio
+import contextvars
 import xml.etree.ElementTree
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
 import atexit
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+import email.utils
+import hashlib
+from urllib.parse import urlparse
 from PIL import Image
 
 
+try:
+    import lxml  # optional, parses pages several times faster than html.parser
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
 #! Interactive CLI mode flag
 interactive_cli = True   # Set to False when building the executable with PyInstaller for it launches the GUI by default
 
 
 #@ ---------------------- CORE FUNCTIONS ----------------------
 
+# The only elements of a ThePosterDB page the scrapers read: the poster grid, the set link and the upload count
+POSTERDB_STRAINER = SoupStrainer(
+    ["div", "a", "span"],
+    class_=["row d-flex flex-wrap m-0 w-100 mx-n1 mt-n1", "rounded view_all", "numCount"],
+)
+
+# Fields of a MediUX set requested from its API ("mediux_backend": "api"), matching what scrape_mediux_set reads
+MEDIUX_API_FIELDS = ",".join([
+    "files.id", "files.fileType", "files.title",
+    "files.show_id.id", "files.show_id_backdrop.id", "files.season_id.id",
+    "files.episode_id.id", "files.episode_id.season_id.season_number",
+    "files.movie_id.id", "files.collection_id.id",
+    "show.name", "show.first_air_date", "show.seasons.id", "show.seasons.season_number",
+    "movie.title", "movie.release_date",
+    "collection.collection_name", "collection.movies.id", "collection.movies.title", "collection.movies.release_date",
+])
+# Width/quality requested from MediUX's image endpoint, overridable per kind with "mediux_quality"
+DEFAULT_MEDIUX_QUALITY = {"width": 3840, "quality": 80}
+
+# Requests per second and burst size per domain, overridable with "rate_limits" in config.json
+DEFAULT_RATE_LIMITS = {
+    "theposterdb.com": {"rate": 1, "burst": 5},
+}
+rate_limiter = None
+# Settings from config.json, loaded at the start of each run (or on first use)
+config_settings = None
+# Every connected Plex server ("servers" in config.json, or base_url/token); plex is the first one
+plex = None
+plex_servers = []
+# Upload concurrency set per server in "servers": machineIdentifier -> workers
+server_upload_workers = {}
+# Requests in flight per domain in the async core ("default" covers every other site), overridable with "host_concurrency"
+DEFAULT_HOST_CONCURRENCY = {"default": 8}
+http_session = None
+http_session_lock = threading.Lock()
+# Persistent cache of scraped pages; "ttl" in seconds, "max_mb" bounds the file before LRU eviction
+DEFAULT_PAGE_CACHE = {"enabled": True, "path": "cache/pages.sqlite3", "ttl": 3600, "max_mb": 256}
+page_cache = None
+
+# Per-run index of library sections: (server, section key) -> {(normalized title, year): [items]}
+library_indexes = {}
+library_index_lock = threading.Lock()
+# One lock per cached index, so listing one section never blocks lookups in another section or server
+index_locks = {}
+# Per-run index of collections: (server, section key) -> {title: [collections]}, and the sections re-listed since
+collection_indexes = {}
+collection_refreshes = set()
+# Per-run season/episode trees: (server, show ratingKey) -> {season number: (season, {episode number: episode})}
+show_trees = {}
+# Ledger of applied art: (server, ratingKey, poster/art) -> source URL
+DEFAULT_UPLOAD_LEDGER = {"enabled": True, "path": "cache/uploads.sqlite3"}
+upload_ledger = None
+upload_ledger_lock = threading.Lock()
+# Per-run cache of image content hashes: local image path -> sha1
+image_digests = {}
+# Optional content-addressed store of downloaded images, uploaded to Plex from disk
+DEFAULT_IMAGE_CACHE = {"enabled": False, "path": "cache/images"}
+image_cache = None
+image_cache_lock = threading.Lock()
+# Optional resize/recompress of cached images before upload; "max_size" is [width, height] per kind
+DEFAULT_IMAGE_PROCESSING = {
+    "enabled": False,
+    "format": "jpeg",
+    "quality": 85,
+    "workers": None,
+    "max_size": {"poster": [1000, 1500], "backdrop": [1920, 1080], "title_card": [1280, 720]},
+}
+image_pool = None
+
+
+class TargetKind(Enum):
+    '''What a poster is applied to. Values match the "mediux_filters" names.'''
+    SHOW_COVER = "show_cover"
+    BACKDROP = "background"
+    SEASON_COVER = "season_cover"    # season 0 is Specials
+    TITLE_CARD = "title_card"
+    MOVIE = "movie"
+    COLLECTION = "collection"
+
+
+@dataclass(frozen=True, slots=True)
+class PosterRecord:
+    '''One scraped image and the Plex target it belongs to. Hashable, so duplicates collapse in sets/dicts.'''
+    kind: TargetKind
+    title: str
+    url: str
+    source: str
+    year: Optional[int] = None
+    season: Optional[int] = None
+    episode: Optional[int] = None
+
+    @property
+    def target(self):
+        '''The Plex target this poster applies to, regardless of which image it is. Titles compare as the library index does.'''
+        return (self.kind, normalize_title(self.title), self.year, self.season, self.episode)
+
+    @property
+    def upload_key(self):
+        '''Key of the uploads that must not overlap: a year-less title can resolve to any year's item, so the year is left out.'''
+        return (self.kind, normalize_title(self.title), self.season, self.episode)
+
+    @property
+    def label(self):
+        if self.kind is TargetKind.TITLE_CARD:
+            return f"{self.title} - Season {self.season} Episode {self.episode}"
+        if self.kind is TargetKind.SEASON_COVER:
+            return f"{self.title} - Specials" if self.season == 0 else f"{self.title} - Season {self.season}"
+        return self.title
+
+    def describe(self):
+        art = {TargetKind.SHOW_COVER: "cover art", TargetKind.BACKDROP: "background art"}.get(self.kind, "art")
+        return f"{art} for {self.label}"
+
+
+def load_settings():
+    '''Read config.json for the run that is starting. Edits made during a run (e.g. from the GUI) apply to the next one.'''
+    global config_settings
+    try:
+        with open("config.json") as config_file:
+            config_settings = json.load(config_file)
+    except (OSError, ValueError):
+        config_settings = {}
+    return config_settings
+
+
+def get_config_setting(key, default=None):
+    '''Read a single setting from config.json as loaded for this run, falling back to the default.'''
+    settings = config_settings if config_settings is not None else load_settings()
+    return settings.get(key, default)
+
+
+class PosterError(Exception):
+    '''A failure scraping a URL or uploading a poster. Transient failures are worth retrying.'''
+    kind = "error"
+
+    def __init__(self, message, transient=False):
+        super().__init__(message)
+        self.transient = transient
+
+
+class NetworkError(PosterError):
+    kind = "network"
+
+
+class NotFoundError(PosterError):
+    kind = "not-found"
+
+
+class ParseError(PosterError):
+    kind = "parse"
+
+
+class UploadError(PosterError):
+    kind = "upload"
+
+
+def classify_error(e, default=UploadError):
+    '''Map an exception raised while scraping or uploading to a PosterError.'''
+    if isinstance(e, PosterError):
+        return e
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        status = e.response.status_code
+        if status in (404, 410):
+            return NotFoundError(str(e))
+        return NetworkError(str(e), transient=status == 429 or status >= 500)
+    if isinstance(e, requests.RequestException):
+        return NetworkError(str(e), transient=True)
+    if isinstance(e, plexapi.exceptions.NotFound):
+        return NotFoundError(str(e))
+    return default(str(e) or type(e).__name__)
+
+
+def get_error_retries():
+    '''How many times a transient failure is retried ("error_retries" in config.json).'''
+    try:
+        return max(0, int(get_config_setting("error_retries", 2)))
+    except (TypeError, ValueError):
+        return 2
+
+
+def retry_transient(fn, *args, default=UploadError):
+    '''Call fn(*args), retrying transient failures with backoff. Any failure is raised as a PosterError.'''
+    retries = get_error_retries()
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args)
+        except Exception as e:
+            error = classify_error(e, default)
+            if not error.transient or attempt == retries:
+                raise error from e
+        time.sleep(2 ** attempt)
+
+
+class ErrorLog:
+    '''Failures collected during a run, summarized once it finishes instead of aborting it.'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.errors = []
+
+    def clear(self):
+        with self.lock:
+            self.errors = []
+
+    def record(self, error, subject):
+        with self.lock:
+            self.errors.append((error.kind, subject, str(error)))
+
+    def summary(self):
+        with self.lock:
+            errors = list(self.errors)
+        if not errors:
+            return "Completed with no errors."
+        counts = {}
+        for kind, _, _ in errors:
+            counts[kind] = counts.get(kind, 0) + 1
+        lines = [f"Completed with {len(errors)} errors ({', '.join(f'{count} {kind}' for kind, count in counts.items())}):"]
+        lines.extend(f"  [{kind}] {subject}: {message}" for kind, subject, message in errors)
+        return "\n".join(lines)
+
+
+run_errors = ErrorLog()
+
+
 def plex_setup(gui_mode=False):
-    global plex
+    '''Connect to every configured Plex server and return their TV and movie library sections.'''
+    global plex, rate_limiter, config_settings
     plex = None
+    rate_limiter = None
+    plex_servers.clear()
+    server_upload_workers.clear()
+    close_http_session()
+    close_upload_ledger()
+    close_image_cache()
+    reset_library_indexes()
     
     # Check if config.json exists
     if os.path.exists("config.json"):
         try:
             config = json.load(open("config.json"))
+            config_settings = config
             base_url = config.get("base_url", "")
             token = config.get("token", "")
             tv_library = config.get("tv_library", [])
             movie_library = config.get("movie_library", [])
+            servers = config.get("servers") or [{"base_url": base_url, "token": token}]
         except Exception as e:
             if gui_mode:
                 app.after(300, update_error, f"Error with config.json: {str(e)}")
@@ -42,46 +296,77 @@ def plex_setup(gui_mode=False):
             return None, None
     else:
         # No config file, skip setting up Plex for now
-        base_url, token, tv_library, movie_library = "", "", [], []
+        config_settings = {}
+        tv_library, movie_library = [], []
+        servers = [{"base_url": "", "token": ""}]
+
+    # Every server gets the same posters; libraries default to the top-level ones
+    tv, movies = [], []
+    for server_config in servers:
+        connected = connect_plex_server(
+            server_config.get("base_url", ""),
+            server_config.get("token", ""),
+            server_config.get("tv_library", tv_library),
+            server_config.get("movie_library", movie_library),
+            gui_mode,
+        )
+        if connected is None:
+            return None, None
+        server, server_tv, server_movies = connected
+        if "upload_workers" in server_config:
+            try:
+                server_upload_workers[server.machineIdentifier] = max(1, int(server_config["upload_workers"]))
+            except (TypeError, ValueError):
+                # fall back to the top-level "upload_workers", like get_upload_workers does
+                print(f"Invalid upload_workers for {server_config.get('base_url')}, using {get_upload_workers()}.")
+        plex_servers.append(server)
+        tv.extend(server_tv)
+        movies.extend(server_movies)
+
+    plex = plex_servers[0]
+    return tv, movies
 
+
+def connect_plex_server(base_url, token, tv_library, movie_library, gui_mode=False):
+    '''Connect to one Plex server and look up its libraries. Returns (server, tv, movies), or None on failure.'''
     # Validate the fields
     if not base_url or not token:
         if gui_mode:
             app.after(100, update_error, "Invalid Plex token or base URL. Please provide valid values in config.json or via the GUI.")
         else:
             print('Invalid Plex token or base URL. Please provide valid values in config.json or via the GUI.')
-        return None, None
+        return None
 
     try:
-        plex = PlexServer(base_url, token)  # Initialize the Plex server connection
+        server = PlexServer(base_url, token)  # Initialize the Plex server connection
     except requests.exceptions.RequestException as e:
         # Handle network-related errors (e.g., unable to reach the server)
         if gui_mode:
             app.after(100, update_error, f"Unable to connect to Plex server: {str(e)}")
         else:
-            sys.exit('Unable to connect to Plex server. Please check the "base_url" in config.json or provide one.')
-        return None, None
+            sys.exit(f'Unable to connect to Plex server at {base_url}. Please check the "base_url" in config.json or provide one.')
+        return None
     except plexapi.exceptions.Unauthorized as e:
         # Handle authentication-related errors (e.g., invalid token)
         if gui_mode:
             app.after(100, update_error, f"Invalid Plex token: {str(e)}")
         else:
-            sys.exit('Invalid Plex token. Please check the "token" in config.json or provide one.')
-        return None, None
+            sys.exit(f'Invalid Plex token for {base_url}. Please check the "token" in config.json or provide one.')
+        return None
     except xml.etree.ElementTree.ParseError as e:
         # Handle XML parsing errors (e.g., invalid XML response from Plex)
         if gui_mode:
             app.after(100, update_error, f"Received invalid XML from Plex server: {str(e)}")
         else:
             print("Received invalid XML from Plex server. Check server connection.")
-        return None, None
+        return None
     except Exception as e:
         # Handle any other unexpected errors
         if gui_mode:
             app.after(100, update_error, f"Unexpected error: {str(e)}")
         else:
             sys.exit(f"Unexpected error: {str(e)}")
-        return None, None
+        return None
 
     # Continue with the setup (assuming plex server is successfully initialized)
     if isinstance(tv_library, str):
@@ -94,7 +379,7 @@ def plex_setup(gui_mode=False):
     tv = []
     for tv_lib in tv_library:
         try:
-            plex_tv = plex.library.section(tv_lib)
+            plex_tv = server.library.section(tv_lib)
             tv.append(plex_tv)
         except plexapi.exceptions.NotFound as e:
             if gui_mode:
@@ -112,7 +397,7 @@ def plex_setup(gui_mode=False):
     movies = []
     for movie_lib in movie_library:
         try:
-            plex_movie = plex.library.section(movie_lib)
+            plex_movie = server.library.section(movie_lib)
             movies.append(plex_movie)
         except plexapi.exceptions.NotFound as e:
             if gui_mode:
@@ -120,24 +405,268 @@ def plex_setup(gui_mode=False):
             else:
                 sys.exit(f'Movie library named "{movie_lib}" not found. Please check the "movie_library" in config.json or provide one.')
 
-    return tv, movies
+    return server, tv, movies
+
 
 
+class RateLimiter:
+    '''Per-host token bucket shared by scraping and uploading.'''
 
-def cook_soup(url):  
-    headers = { 
-               'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36', 
-               'Sec-Ch-Ua-Mobile': '?0', 
-               'Sec-Ch-Ua-Platform': 'Windows' 
-            }
+    def __init__(self, limits):
+        self.limits = limits    # domain -> (requests per second, burst)
+        self.buckets = {}       # domain -> (tokens, last refill, blocked until)
+        self.lock = threading.Lock()
 
-    response = requests.get(url, headers=headers)
+    def _domain(self, url):
+        host = urlparse(url).hostname or ""
+        for domain in self.limits:
+            if host == domain or host.endswith("." + domain):
+                return domain
+        return None
 
+    def acquire(self, url):
+        '''Wait until a request to the URL's host is allowed.'''
+        domain = self._domain(url)
+        if domain is None:
+            return
+        rate, burst = self.limits[domain]
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                tokens, updated, blocked_until = self.buckets.get(domain, (burst, now, 0))
+                tokens = min(burst, tokens + (now - updated) * rate)
+                if now >= blocked_until and tokens >= 1:
+                    self.buckets[domain] = (tokens - 1, now, blocked_until)
+                    return
+                self.buckets[domain] = (tokens, now, blocked_until)
+                delay = max(blocked_until - now, (1 - tokens) / rate)
+            time.sleep(delay)
+
+    def backoff(self, url, seconds):
+        '''Hold every request to the URL's host for the given number of seconds (e.g. after a 429).'''
+        domain = self._domain(url)
+        if domain is None:
+            return
+        with self.lock:
+            now = time.monotonic()
+            _, _, blocked_until = self.buckets.get(domain, (0, now, 0))
+            self.buckets[domain] = (0, now, max(blocked_until, now + seconds))
+
+
+def get_rate_limiter():
+    '''Return the shared rate limiter, built from "rate_limits" in config.json.'''
+    global rate_limiter
+    if rate_limiter is None:
+        limits = dict(DEFAULT_RATE_LIMITS)
+        limits.update(get_config_setting("rate_limits", None) or {})
+        rate_limiter = RateLimiter({
+            domain: (float(limit["rate"]), max(1, int(limit.get("burst", 1))))
+            for domain, limit in limits.items() if limit and float(limit.get("rate", 0)) > 0
+        })
+    return rate_limiter
+
+
+def retry_after_seconds(response, default=30):
+    '''Parse a Retry-After header given either in seconds or as an HTTP date.'''
+    value = response.headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+def get_http_session():
+    '''Return the shared keep-alive session used for all scraping, with retries on transient errors.'''
+    global http_session
+    with http_session_lock:
+        if http_session is None:
+            retries = Retry(
+                total=int(get_config_setting("request_retries", 3)),
+                backoff_factor=1,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,
+            )
+            pool_size = max(10, get_upload_workers())
+            adapter = HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({ 
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36', 
+                'Sec-Ch-Ua-Mobile': '?0', 
+                'Sec-Ch-Ua-Platform': 'Windows',
+                'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING,   # includes br when brotli is installed
+            })
+            http_session = session
+        return http_session
+
+
+def close_http_session():
+    global http_session, page_cache
+    with http_session_lock:
+        if http_session is not None:
+            http_session.close()
+            http_session = None
+        if page_cache is not None:
+            page_cache.close()
+            page_cache = None
+
+
+def get_request_timeout():
+    '''(connect, read) timeout in seconds for scraping requests ("request_timeout" in config.json).'''
+    try:
+        timeout = float(get_config_setting("request_timeout", 30))
+    except (TypeError, ValueError):
+        timeout = 30
+    return (min(10, timeout), timeout)
+
+
+class PageCache:
+    '''On-disk cache of fetched pages, revalidated with ETag/Last-Modified and evicted least-recently-used.'''
+
+    def __init__(self, path, ttl, max_bytes):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, status INTEGER, body TEXT, etag TEXT, last_modified TEXT, "
+            "fetched_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+        self.db.commit()
+
+    def get(self, url):
+        '''Return the cached entry for a URL as a dict, or None.'''
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+        status, body, etag, last_modified, fetched_at = row
+        return {"status": status, "body": body, "etag": etag, "last_modified": last_modified, "fetched_at": fetched_at}
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def put(self, url, status, body, etag=None, last_modified=None):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, body, etag, last_modified, now, now, len(body.encode("utf-8"))),
+            )
+            self._evict()
+            self.db.commit()
+
+    def touch(self, url):
+        '''Mark a cached page as fresh again after a 304 Not Modified.'''
+        with self.lock:
+            self.db.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.db.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall():
+            self.db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def get_page_cache():
+    '''Return the shared page cache configured by "page_cache" in config.json, or None when disabled.'''
+    global page_cache
+    with http_session_lock:
+        if page_cache is None:
+            settings = {**DEFAULT_PAGE_CACHE, **(get_config_setting("page_cache", None) or {})}
+            if not settings["enabled"]:
+                return None
+            page_cache = PageCache(settings["path"], float(settings["ttl"]), int(float(settings["max_mb"]) * 1024 * 1024))
+        return page_cache
+
+
+def fetch_page(url):
+    '''Fetch a page's HTML, serving it from the page cache while fresh and revalidating it once stale.'''
+    cache = get_page_cache()
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        return entry["body"]
+
+    headers = {}
+    if entry and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    session = get_http_session()
+    limiter = get_rate_limiter()
+    try:
+        for attempt in range(5):
+            limiter.acquire(url)
+            response = session.get(url, headers=headers, timeout=get_request_timeout())
+            if response.status_code != 429:
+                break
+            limiter.backoff(url, retry_after_seconds(response))
+    except requests.RequestException as e:
+        raise NetworkError(f"Failed to retrieve {url}: {e}") from e
+
+    # the session and the 429 loop above are the only retries for a page, so its errors are final
+    if response.status_code == 304 and entry:
+        cache.touch(url)
+        return entry["body"]
     if response.status_code == 200 or (response.status_code == 500 and "mediux.pro" in url):
-        soup = BeautifulSoup(response.text, 'html.parser')
-        return soup
-    else:
-        sys.exit(f"Failed to retrieve the page. Status code: {response.status_code}")    
+        if cache:
+            cache.put(url, response.status_code, response.text,
+                      response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response.text
+    if response.status_code in (404, 410):
+        raise NotFoundError(f"Failed to retrieve {url}. Status code: {response.status_code}")
+    raise NetworkError(f"Failed to retrieve {url}. Status code: {response.status_code}")
+
+
+def fetch_image(url):
+    '''Download an image's bytes through the shared session and rate limiter.'''
+    session = get_http_session()
+    limiter = get_rate_limiter()
+    try:
+        for attempt in range(5):
+            limiter.acquire(url)
+            response = session.get(url, timeout=get_request_timeout())
+            if response.status_code != 429:
+                break
+            limiter.backoff(url, retry_after_seconds(response))
+    except requests.RequestException as e:
+        raise NetworkError(f"Failed to retrieve {url}: {e}") from e
+    if response.status_code in (404, 410):
+        raise NotFoundError(f"Failed to retrieve {url}. Status code: {response.status_code}")
+    if response.status_code != 200:
+        raise NetworkError(f"Failed to retrieve {url}. Status code: {response.status_code}")
+    return response.content
+
+
+def cook_soup(url, parse_only=None):  
+    soup = BeautifulSoup(fetch_page(url), HTML_PARSER, parse_only=parse_only)
+    return soup
 
 
 def title_cleaner(string):
@@ -153,152 +682,760 @@ def title_cleaner(string):
     return title
 
 
-def parse_string_to_dict(input_string):
-    # Remove unnecessary replacements
-    input_string = input_string.replace('\\\\\\\"', "")
-    input_string = input_string.replace("\\","")
-    input_string = input_string.replace("u0026", "&")
+def extract_mediux_set_data(page):
+    '''Find the Next.js flight chunk carrying the set JSON in a raw MediUX page and decode it.'''
+    decoder = json.JSONDecoder()
+    marker = 'self.__next_f.push([1,"'
+    pos = page.find(marker)
+    while pos != -1:
+        start = pos + len(marker) - 1    # the opening quote of the JS string
+        end = page.find(marker, start)
+        if end == -1:
+            end = len(page)
+        # cheap checks on the still-escaped text before decoding anything
+        if page.find('\\"files\\"', start, end) != -1 and page.find('\\"set\\"', start, end) != -1:
+            chunk, _ = decoder.raw_decode(page, start)
+            set_start = chunk.find('{"set":')
+            if set_start != -1:
+                try:
+                    data_dict, _ = decoder.raw_decode(chunk, set_start)
+                except ValueError:
+                    data_dict = None
+                if data_dict and isinstance(data_dict["set"], dict) and "files" in data_dict["set"]:
+                    return data_dict
+        pos = end if end < len(page) else -1
+    raise ValueError("MediUX set data not found in page.")
+
+
+def normalize_title(title):
+    '''Normalize a title for index lookups (case, "&" vs "and", punctuation and spacing).'''
+    title = title.casefold().replace("&", " and ")
+    title = re.sub(r"[^\w\s]", "", title)
+    return " ".join(title.split())
+
+
+def section_cache_key(lib):
+    '''Key identifying a library section across servers.'''
+    return (lib._server.machineIdentifier, lib.key)
+
+
+def reset_library_indexes():
+    '''Drop every cached library, collection and show index so the next lookup re-fetches from Plex.'''
+    with library_index_lock:
+        library_indexes.clear()
+        collection_indexes.clear()
+        collection_refreshes.clear()
+        show_trees.clear()
+        image_digests.clear()
+        index_locks.clear()
+
+
+def start_run():
+    '''Begin a scrape/upload run: re-read config.json and forget what earlier runs (e.g. in the interactive CLI) looked up.'''
+    load_settings()
+    reset_library_indexes()
+
+
+def index_lock(key):
+    '''Lock serializing the fetch of one cached index (a section listing, its collections or a show tree).'''
+    with library_index_lock:
+        return index_locks.setdefault(key, threading.Lock())
+
+
+def get_library_index(lib):
+    '''Return the title/year index of a library section, listing the section once per run.'''
+    key = section_cache_key(lib)
+    index = library_indexes.get(key)
+    if index is None:
+        with index_lock(("library",) + key):
+            index = library_indexes.get(key)
+            if index is None:
+                index = {}
+                for item in lib.all():
+                    title = normalize_title(item.title)
+                    index.setdefault((title, item.year), []).append(item)
+                    index.setdefault((title, None), []).append(item)
+                library_indexes[key] = index
+    return index
+
+
+def lookup_library_item(lib, title, year):
+    '''Resolve a title/year in a library section from its index, searching Plex only on a miss.'''
+    index = get_library_index(lib)
+    key = (normalize_title(title), year)
+    if key not in index:
+        # Plex search is more lenient than an exact title match, so fall back to it once
+        # and remember the answer (including "not found") for the rest of the run.
+        try:
+            if year is not None:
+                found = [lib.get(title, year=year)]
+            else:
+                found = [lib.get(title)]
+        except plexapi.exceptions.NotFound:
+            found = []
+        index.setdefault(key, found)
+    matches = index[key]
+    return matches[0] if matches else None
+
+
+def get_show_tree(tv_show):
+    '''Return {season number: (season, {episode number: episode})} for a show, fetched once per run.'''
+    key = (tv_show._server.machineIdentifier, tv_show.ratingKey)
+    tree = show_trees.get(key)
+    if tree is None:
+        # concurrent uploads for the same show wait for one fetch instead of each making their own
+        with index_lock(("show",) + key):
+            tree = show_trees.get(key)
+            if tree is None:
+                tree = {season.index: (season, {}) for season in tv_show.seasons()}
+                for episode in tv_show.episodes():
+                    if episode.parentIndex in tree:
+                        tree[episode.parentIndex][1][episode.index] = episode
+                show_trees[key] = tree
+    return tree
+
+
+def get_season(tv_show, season_number):
+    '''Look up a season (0 for Specials) in the cached show tree.'''
+    try:
+        return get_show_tree(tv_show)[season_number][0]
+    except KeyError:
+        raise plexapi.exceptions.NotFound(f"Season {season_number} of {tv_show.title} not found") from None
 
-    # Find JSON data in the input string
-    json_start_index = input_string.find('{')
-    json_end_index = input_string.rfind('}')
-    json_data = input_string[json_start_index:json_end_index+1]
 
-    # Parse JSON data into a dictionary
-    parsed_dict = json.loads(json_data)
-    return parsed_dict
+def get_episode(tv_show, season_number, episode_number):
+    '''Look up an episode in the cached show tree.'''
+    try:
+        return get_show_tree(tv_show)[season_number][1][episode_number]
+    except KeyError:
+        raise plexapi.exceptions.NotFound(f"Episode S{season_number}E{episode_number} of {tv_show.title} not found") from None
 
 
 def find_in_library(library, poster):
     items = []
     for lib in library:
         try:
-            if poster["year"] is not None:
-                library_item = lib.get(poster["title"], year=poster["year"])
-            else:
-                library_item = lib.get(poster["title"])
-            
+            library_item = lookup_library_item(lib, poster.title, poster.year)
             if library_item:
                 items.append(library_item)
-        except:
-            pass
+        except (plexapi.exceptions.PlexApiException, requests.RequestException) as e:
+            print(f"Unable to search {lib.title} for {poster.title}: {e}")
     
     if items:
         return items
     
-    print(f"{poster['title']} not found, skipping.")
+    print(f"{poster.title} not found, skipping.")
     return None
 
 
+def get_collection_index(lib, refresh=False):
+    '''Return the title -> collections index of a library section, listing its collections once per run.
+    With refresh, the section is listed again, but only the first time a refresh is asked for.'''
+    key = section_cache_key(lib)
+    index = collection_indexes.get(key)
+    if index is None or (refresh and key not in collection_refreshes):
+        with index_lock(("collections",) + key):
+            if key not in collection_indexes or (refresh and key not in collection_refreshes):
+                if key in collection_indexes:
+                    collection_refreshes.add(key)
+                index = {}
+                for plex_collection in lib.collections():
+                    index.setdefault(plex_collection.title, []).append(plex_collection)
+                collection_indexes[key] = index
+            index = collection_indexes[key]
+    return index
+
+
 def find_collection(library, poster):
     collections = []
     for lib in library:
         try:
-            movie_collections = lib.collections()
-            for plex_collection in movie_collections:
-                if plex_collection.title == poster["title"]:
-                    collections.append(plex_collection)
-        except:
-            pass
+            collections.extend(get_collection_index(lib).get(poster.title, []))
+        except (plexapi.exceptions.PlexApiException, requests.RequestException) as e:
+            print(f"Unable to list the collections of {lib.title}: {e}")
+
+    if not collections:
+        # The collection may have been created since the index was built; each section is re-listed once per run.
+        for lib in library:
+            try:
+                collections.extend(get_collection_index(lib, refresh=True).get(poster.title, []))
+            except (plexapi.exceptions.PlexApiException, requests.RequestException) as e:
+                print(f"Unable to list the collections of {lib.title}: {e}")
 
     if collections:
         return collections
 
-    #print(f"{poster['title']} collection not found, skipping.")
+    #print(f"{poster.title} collection not found, skipping.")
     return None
 
 
+class UploadLedger:
+    '''Local record of the art applied to each Plex item, so unchanged sets are not uploaded again.'''
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        # every source applied to a target, so overlapping sets re-select their art instead of uploading it again
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS applied ("
+            "server TEXT, rating_key TEXT, target_kind TEXT, source TEXT, uploaded_at REAL, "
+            "PRIMARY KEY (server, rating_key, target_kind, source))"
+        )
+        # ledgers written before every source was kept only hold the last one per target
+        if self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'uploads'").fetchone():
+            self.db.execute("INSERT OR IGNORE INTO applied SELECT server, rating_key, target_kind, source, uploaded_at FROM uploads")
+            self.db.execute("DROP TABLE uploads")
+        self.db.commit()
+
+    @staticmethod
+    def _key(target, target_kind):
+        return (target._server.machineIdentifier, str(target.ratingKey), target_kind)
+
+    def is_applied(self, target, target_kind, source):
+        '''True if this source was the last art uploaded to the target.'''
+        with self.lock:
+            row = self.db.execute(
+                "SELECT source FROM applied WHERE server = ? AND rating_key = ? AND target_kind = ? "
+                "ORDER BY uploaded_at DESC, rowid DESC LIMIT 1",
+                self._key(target, target_kind),
+            ).fetchone()
+        return row is not None and row[0] == source
+
+    def was_applied(self, target, target_kind, source):
+        '''True if this source was uploaded to the target at some point, so Plex already stores it.'''
+        with self.lock:
+            row = self.db.execute(
+                "SELECT 1 FROM applied WHERE server = ? AND rating_key = ? AND target_kind = ? AND source = ?",
+                (*self._key(target, target_kind), source),
+            ).fetchone()
+        return row is not None
+
+    def record(self, target, target_kind, source):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO applied VALUES (?, ?, ?, ?, ?)",
+                (*self._key(target, target_kind), source, time.time()),
+            )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def get_upload_ledger():
+    '''Return the shared upload ledger configured by "upload_ledger" in config.json, or None when disabled.'''
+    global upload_ledger
+    with upload_ledger_lock:
+        if upload_ledger is None:
+            settings = {**DEFAULT_UPLOAD_LEDGER, **(get_config_setting("upload_ledger", None) or {})}
+            if not settings["enabled"]:
+                return None
+            upload_ledger = UploadLedger(settings["path"])
+        return upload_ledger
+
+
+def close_upload_ledger():
+    global upload_ledger
+    with upload_ledger_lock:
+        if upload_ledger is not None:
+            upload_ledger.close()
+            upload_ledger = None
+
+
+class ImageCache:
+    '''Content-addressed store of downloaded images, so each source is fetched once and reused across libraries and runs.'''
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.url_locks = {}
+        self.db = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS images (url TEXT PRIMARY KEY, digest TEXT)")
+        self.db.commit()
+
+    def file_path(self, digest):
+        return os.path.join(self.path, digest[:2], digest)
+
+    def digest(self, url):
+        '''SHA-1 of an image's content, downloading it into the cache unless it is already there.'''
+        with self.lock:
+            url_lock = self.url_locks.setdefault(url, threading.Lock())
+        # one download per URL even when several libraries ask for it at once
+        with url_lock:
+            with self.lock:
+                row = self.db.execute("SELECT digest FROM images WHERE url = ?", (url,)).fetchone()
+            if row and os.path.exists(self.file_path(row[0])):
+                return row[0]
+
+            content = fetch_image(url)
+            digest = hashlib.sha1(content).hexdigest()
+            file_path = self.file_path(digest)
+            if not os.path.exists(file_path):
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as image_file:
+                    image_file.write(content)
+                os.replace(temp_path, file_path)
+            with self.lock:
+                self.db.execute("INSERT OR REPLACE INTO images VALUES (?, ?)", (url, digest))
+                self.db.commit()
+            return digest
+
+    def fetch(self, url):
+        '''Path of the cached copy of an image, downloading it first if needed.'''
+        return self.file_path(self.digest(url))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def get_image_cache():
+    '''Return the shared image cache configured by "image_cache" in config.json, or None when disabled.'''
+    global image_cache
+    with image_cache_lock:
+        if image_cache is None:
+            settings = {**DEFAULT_IMAGE_CACHE, **(get_config_setting("image_cache", None) or {})}
+            # processed images are written next to the originals, so processing turns the cache on
+            if not settings["enabled"] and get_image_processing() is None:
+                return None
+            image_cache = ImageCache(settings["path"])
+        return image_cache
+
+
+def close_image_cache():
+    global image_cache
+    with image_cache_lock:
+        if image_cache is not None:
+            image_cache.close()
+            image_cache = None
+
+
+def get_image_processing():
+    '''Return the "image_processing" settings from config.json, or None when disabled.'''
+    settings = get_config_setting("image_processing", None) or {}
+    settings = {**DEFAULT_IMAGE_PROCESSING, **settings, "max_size": {**DEFAULT_IMAGE_PROCESSING["max_size"], **settings.get("max_size", {})}}
+    return settings if settings["enabled"] else None
+
+
+def get_image_pool():
+    '''Return the process pool that resizes images, started on first use.'''
+    global image_pool
+    with image_cache_lock:
+        if image_pool is None:
+            # spawn, not fork: this runs on a worker thread of a process holding threads and sqlite connections
+            image_pool = ProcessPoolExecutor(max_workers=get_image_processing()["workers"], mp_context=multiprocessing.get_context("spawn"))
+        return image_pool
+
+
+def close_image_pool():
+    global image_pool
+    with image_cache_lock:
+        if image_pool is not None:
+            image_pool.shutdown(wait=True)
+            image_pool = None
+
+
+def process_image(source_path, dest_path, max_size, image_format, quality):
+    '''Shrink an image to fit max_size and re-encode it (runs in the image pool). Returns the path to upload.'''
+    with Image.open(source_path) as image:
+        if image.width <= max_size[0] and image.height <= max_size[1] and image.format.lower() == image_format:
+            return source_path
+        image.thumbnail(max_size, Image.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        temp_path = f"{dest_path}.{os.getpid()}.tmp"
+        image.save(temp_path, format=image_format.upper(), quality=quality, optimize=True)
+    os.replace(temp_path, dest_path)
+    return dest_path
+
+
+# Which "max_size" entry of "image_processing" applies to each kind
+IMAGE_SIZE_KINDS = {
+    TargetKind.SHOW_COVER: "poster",
+    TargetKind.SEASON_COVER: "poster",
+    TargetKind.MOVIE: "poster",
+    TargetKind.COLLECTION: "poster",
+    TargetKind.BACKDROP: "backdrop",
+    TargetKind.TITLE_CARD: "title_card",
+}
+
+
+def prepare_image(cache, poster):
+    '''Path of the file to upload for a poster: the cached image, resized for its kind when processing is on.'''
+    source_path = cache.fetch(poster.url)
+    settings = get_image_processing()
+    if settings is None:
+        return source_path
+
+    image_format = settings["format"].lower()
+    max_size = tuple(settings["max_size"][IMAGE_SIZE_KINDS[poster.kind]])
+    dest_path = f"{source_path}.{max_size[0]}x{max_size[1]}q{settings['quality']}.{image_format}"
+    if os.path.exists(dest_path):
+        return dest_path
+    return get_image_pool().submit(process_image, source_path, dest_path, max_size, image_format, settings["quality"]).result()
+
+
+def file_digest(path):
+    '''SHA-1 of a local file, computed once per run.'''
+    digest = image_digests.get(path)
+    if digest is None:
+        with open(path, "rb") as image_file:
+            digest = image_digests.setdefault(path, hashlib.sha1(image_file.read()).hexdigest())
+    return digest
+
+
+def find_existing_art(upload_target, url, art=False, image_path=None):
+    '''Return the Plex poster/art resource that already holds this source (or the local file to upload), or None.'''
+    resources = upload_target.arts() if art else upload_target.posters()
+    for resource in resources:
+        if url in (resource.ratingKey, resource.key):
+            return resource
+
+    # Plex stores uploaded images as upload://posters/<sha1 of the content>
+    uploaded = {
+        resource.ratingKey.rsplit("/", 1)[-1]: resource
+        for resource in resources if resource.ratingKey and resource.ratingKey.startswith("upload://")
+    }
+    # Only compare content we already hold locally; hashing a remote image would download it twice
+    if not uploaded or image_path is None:
+        return None
+    return uploaded.get(file_digest(image_path))
+
+
+def apply_upload(upload_target, poster, art=False):
+    '''Upload a poster (or background art) to a Plex item. Returns False if it is already applied.'''
+    target_kind = "art" if art else "poster"
+    ledger = get_upload_ledger()
+    if ledger and ledger.is_applied(upload_target, target_kind, poster.url):
+        return False
+
+    # Plex gets the bytes from the cache instead of downloading the image itself
+    cache = get_image_cache()
+    image_path = prepare_image(cache, poster) if cache else None
+
+    # a source applied before (e.g. by an earlier set in the same bulk file) is still stored by Plex
+    previously_applied = ledger is not None and ledger.was_applied(upload_target, target_kind, poster.url)
+    if previously_applied or get_config_setting("skip_existing_art", True):
+        existing = find_existing_art(upload_target, poster.url, art=art, image_path=image_path)
+        if existing is not None:
+            if not existing.selected:
+                existing.select()
+            if ledger:
+                ledger.record(upload_target, target_kind, poster.url)
+            return False
+
+    if image_path:
+        if art:
+            upload_target.uploadArt(filepath=image_path)
+        else:
+            upload_target.uploadPoster(filepath=image_path)
+    else:
+        get_rate_limiter().acquire(poster.url)
+        if art:
+            upload_target.uploadArt(url=poster.url)
+        else:
+            upload_target.uploadPoster(url=poster.url)
+
+    if ledger:
+        ledger.record(upload_target, target_kind, poster.url)
+    return True
+
+
+# How each TV kind finds its Plex item from the matched show
+TV_UPLOAD_TARGETS = {
+    TargetKind.SHOW_COVER: lambda tv_show, poster: tv_show,
+    TargetKind.BACKDROP: lambda tv_show, poster: tv_show,
+    TargetKind.SEASON_COVER: lambda tv_show, poster: get_season(tv_show, poster.season),
+    TargetKind.TITLE_CARD: lambda tv_show, poster: get_episode(tv_show, poster.season, poster.episode),
+}
+
+
 def upload_tv_poster(poster, tv):
+    '''Upload a show, season or episode poster to every TV library; True if every upload went through.'''
     tv_show_items = find_in_library(tv, poster)
-    if tv_show_items:
-        for tv_show in tv_show_items:
-            try:
-                if poster["season"] == "Cover":
-                    upload_target = tv_show
-                    print(f"Uploaded cover art for {poster['title']} - {poster['season']} in {tv_show.librarySectionTitle} library.")
-                elif poster["season"] == 0:
-                    upload_target = tv_show.season("Specials")
-                    print(f"Uploaded art for {poster['title']} - Specials in {tv_show.librarySectionTitle} library.")
-                elif poster["season"] == "Backdrop":
-                    upload_target = tv_show
-                    print(f"Uploaded background art for {poster['title']} in {tv_show.librarySectionTitle} library.")
-                elif poster["season"] >= 1:
-                    if poster["episode"] == "Cover":
-                        upload_target = tv_show.season(poster["season"])
-                        print(f"Uploaded art for {poster['title']} - Season {poster['season']} in {tv_show.librarySectionTitle} library.")
-                    elif poster["episode"] is None:
-                        upload_target = tv_show.season(poster["season"])
-                        print(f"Uploaded art for {poster['title']} - Season {poster['season']} in {tv_show.librarySectionTitle} library.")
-                    elif poster["episode"] is not None:
-                        try:
-                            upload_target = tv_show.season(poster["season"]).episode(poster["episode"])
-                            print(f"Uploaded art for {poster['title']} - Season {poster['season']} Episode {poster['episode']} in {tv_show.librarySectionTitle} library..")
-                        except:
-                            print(f"{poster['title']} - {poster['season']} Episode {poster['episode']} not found in {tv_show.librarySectionTitle} library, skipping.")
-                if poster["season"] == "Backdrop":
-                    try:
-                        upload_target.uploadArt(url=poster['url'])
-                    except:
-                        print("Unable to upload last poster.")
-                else:
-                    try:
-                        upload_target.uploadPoster(url=poster['url'])
-                    except:
-                        print("Unable to upload last poster.")
-                if poster["source"] == "posterdb":
-                    time.sleep(6)  # too many requests prevention
-            except:
-                print(f"{poster['title']} - Season {poster['season']} not found in {tv_show.librarySectionTitle} library, skipping.")
-    else:
-        print(f"{poster['title']} not found in any library.")
+    if not tv_show_items:
+        print(f"{poster.title} not found in any library.")
+        run_errors.record(NotFoundError("not found in any library"), poster.label)
+        return False
+
+    succeeded = True
+    resolve_target = TV_UPLOAD_TARGETS[poster.kind]
+    for tv_show in tv_show_items:
+        try:
+            upload_target = retry_transient(resolve_target, tv_show, poster, default=NotFoundError)
+            if retry_transient(apply_upload, upload_target, poster, poster.kind is TargetKind.BACKDROP):
+                print(f"Uploaded {poster.describe()} in {tv_show.librarySectionTitle} library.")
+            else:
+                print(f"Skipped {poster.describe()} in {tv_show.librarySectionTitle} library, already applied.")
+        except NotFoundError as e:
+            print(f"{poster.label} not found in {tv_show.librarySectionTitle} library, skipping.")
+            run_errors.record(e, f"{poster.label} ({tv_show.librarySectionTitle})")
+            succeeded = False
+        except PosterError as e:
+            print(f"Unable to upload {poster.describe()} in {tv_show.librarySectionTitle} library: {e}")
+            run_errors.record(e, f"{poster.label} ({tv_show.librarySectionTitle})")
+            succeeded = False
+    return succeeded
 
 
 def upload_movie_poster(poster, movies):
+    '''Upload a movie poster to every movie library; True if every upload went through.'''
     movie_items = find_in_library(movies, poster)
-    if movie_items:
-        for movie_item in movie_items:
-            try:
-                movie_item.uploadPoster(poster["url"])
-                print(f'Uploaded art for {poster["title"]} in {movie_item.librarySectionTitle} library.')
-                if poster["source"] == "posterdb":
-                    time.sleep(6)  # too many requests prevention
-            except:
-                print(f'Unable to upload art for {poster["title"]} in {movie_item.librarySectionTitle} library.')
-    else:
-        print(f'{poster["title"]} not found in any library.')
+    if not movie_items:
+        print(f'{poster.title} not found in any library.')
+        run_errors.record(NotFoundError("not found in any library"), poster.title)
+        return False
+
+    succeeded = True
+    for movie_item in movie_items:
+        try:
+            if retry_transient(apply_upload, movie_item, poster):
+                print(f'Uploaded art for {poster.title} in {movie_item.librarySectionTitle} library.')
+            else:
+                print(f'Skipped art for {poster.title} in {movie_item.librarySectionTitle} library, already applied.')
+        except PosterError as e:
+            print(f'Unable to upload art for {poster.title} in {movie_item.librarySectionTitle} library: {e}')
+            run_errors.record(e, f"{poster.title} ({movie_item.librarySectionTitle})")
+            succeeded = False
+    return succeeded
 
 
 def upload_collection_poster(poster, movies):
+    '''Upload a collection poster to every movie library; True if every upload went through.'''
     collection_items = find_collection(movies, poster)
-    if collection_items:
-        for collection in collection_items:
+    if not collection_items:
+        print(f'{poster.title} collection not found in any library.')
+        run_errors.record(NotFoundError("collection not found in any library"), poster.title)
+        return False
+
+    succeeded = True
+    for collection in collection_items:
+        try:
+            if retry_transient(apply_upload, collection, poster):
+                print(f'Uploaded art for {poster.title} in {collection.librarySectionTitle} library.')
+            else:
+                print(f'Skipped art for {poster.title} in {collection.librarySectionTitle} library, already applied.')
+        except PosterError as e:
+            print(f'Unable to upload art for {poster.title} in {collection.librarySectionTitle} library: {e}')
+            run_errors.record(e, f"{poster.title} ({collection.librarySectionTitle})")
+            succeeded = False
+    return succeeded
+
+
+class HostLimits:
+    '''Per-host semaphores capping how many requests the async core has in flight to one site.'''
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.semaphores = {}
+
+    def __call__(self, url):
+        host = urlparse(url).hostname or ""
+        semaphore = self.semaphores.get(host)
+        if semaphore is None:
+            limit = self.limits["default"]
+            for domain, domain_limit in self.limits.items():
+                if host == domain or host.endswith("." + domain):
+                    limit = domain_limit
+                    break
+            semaphore = self.semaphores[host] = asyncio.Semaphore(max(1, int(limit)))
+        return semaphore
+
+
+# The host limits of the running event loop, inherited by every task it starts
+host_limits = contextvars.ContextVar("host_limits")
+
+
+def run_async(coro):
+    '''Run a coroutine of the async core to completion from synchronous code (CLI, GUI worker thread).'''
+    async def main():
+        # requests and plexapi block, so their calls run on this pool; the semaphores are what limit concurrency
+        upload_workers = sum(server_upload_workers.get(server.machineIdentifier, get_upload_workers()) for server in plex_servers)
+        io_pool = ThreadPoolExecutor(max_workers=(upload_workers or get_upload_workers()) + get_scrape_workers() + 4, thread_name_prefix="io")
+        asyncio.get_running_loop().set_default_executor(io_pool)
+        host_limits.set(HostLimits({**DEFAULT_HOST_CONCURRENCY, **(get_config_setting("host_concurrency", None) or {})}))
+        return await coro
+    return asyncio.run(main())
+
+
+async def run_for_host(url, fn, *args, **kwargs):
+    '''Run a blocking call that talks to url's site in a worker thread, within that site's concurrency limit.'''
+    async with host_limits.get()(url):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+class AsyncUploader:
+    '''Runs blocking uploads from the event loop concurrently, keeping jobs for the same target in submission order.'''
+
+    def __init__(self, max_workers=None, max_pending=None):
+        if max_workers is None:
+            max_workers = get_upload_workers()
+        self.running = asyncio.Semaphore(max_workers)
+        # submit() waits once this many jobs are queued or running, pushing back on producers
+        self.max_pending = max_pending or max_workers * 4
+        self.slots = asyncio.Semaphore(self.max_pending)
+        self.last_jobs = {}   # target key -> the most recent job for it, which the next one waits for
+        self.tasks = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.wait()
+
+    async def submit(self, key, fn, *args):
+        '''Start fn(*args) in a worker thread; jobs sharing a key never overlap and run in the order submitted.'''
+        await self.slots.acquire()
+        task = asyncio.create_task(self._run(self.last_jobs.get(key), fn, args))
+        self.last_jobs[key] = task
+        self.tasks.add(task)
+        task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+    async def _run(self, previous, fn, args):
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            async with self.running:
+                return await asyncio.to_thread(fn, *args)
+        finally:
+            self.slots.release()
+
+    def _finished(self, key, task):
+        if self.last_jobs.get(key) is task:
+            del self.last_jobs[key]
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Upload failed: {task.exception()}")
+            run_errors.record(classify_error(task.exception()), "upload")
+
+    async def wait(self):
+        '''Wait until every submitted job has finished.'''
+        while self.tasks:
+            await asyncio.wait(list(self.tasks))
+
+
+class PosterUploader:
+    '''Uploads each poster to every Plex server in parallel, through one AsyncUploader (and limit) per server.'''
+
+    def __init__(self, tv, movies, checkpoint=None, max_pending=None):
+        self.servers = [
+            (AsyncUploader(server_upload_workers.get(server_id), max_pending), server_tv, server_movies)
+            for server_id, server_tv, server_movies in split_by_server(tv, movies)
+        ]
+        # one queue per server, so a server whose slots are full only holds back its own uploads
+        self.queues = [asyncio.Queue(uploader.max_pending) for uploader, _, _ in self.servers]
+        self.feeders = []
+        self.checkpoint = checkpoint
+        self.tasks = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.wait()
+
+    async def submit(self, poster):
+        '''Queue a poster on every server; the returned task is True once all of them applied it.'''
+        if not self.feeders:
+            self.feeders = [asyncio.create_task(self._feed(server, queue)) for server, queue in zip(self.servers, self.queues)]
+        loop = asyncio.get_running_loop()
+        accepted = [loop.create_future() for _ in self.servers]
+        # waits only while a server's own queue is full; the others already have the poster
+        await asyncio.gather(*(queue.put((poster, upload)) for queue, upload in zip(self.queues, accepted)))
+        task = asyncio.create_task(self._finish(poster, accepted))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def _feed(self, server, queue):
+        uploader, server_tv, server_movies = server
+        while True:
+            poster, upload = await queue.get()
             try:
-                collection.uploadPoster(poster["url"])
-                print(f'Uploaded art for {poster["title"]} in {collection.librarySectionTitle} library.')
-                if poster["source"] == "posterdb":
-                    time.sleep(6)  # too many requests prevention
-            except:
-                print(f'Unable to upload art for {poster["title"]} in {collection.librarySectionTitle} library.')
-    else:
-        print(f'{poster["title"]} collection not found in any library.')
+                upload.set_result(await uploader.submit(poster.upload_key, upload_poster, poster, server_tv, server_movies))
+            finally:
+                queue.task_done()
+
+    async def _finish(self, poster, accepted):
+        uploads = await asyncio.gather(*accepted)
+        results = await asyncio.gather(*uploads, return_exceptions=True)
+        succeeded = all(result is True for result in results)
+        if succeeded and self.checkpoint is not None:
+            self.checkpoint.poster_done(poster)
+        return succeeded
+
+    async def wait(self):
+        await asyncio.gather(*(queue.join() for queue in self.queues))
+        for feeder in self.feeders:
+            feeder.cancel()
+        self.feeders = []
+        await asyncio.gather(*(uploader.wait() for uploader, _, _ in self.servers))
+        while self.tasks:
+            await asyncio.wait(list(self.tasks))
+
+
+def get_upload_workers():
+    '''Number of concurrent uploads per Plex server ("upload_workers" in config.json).'''
+    try:
+        return max(1, int(get_config_setting("upload_workers", 4)))
+    except (TypeError, ValueError):
+        return 4
 
 
-def set_posters(url, tv, movies):
-    movieposters, showposters, collectionposters = scrape(url)
+def upload_poster(poster, tv, movies):
+    '''Upload one scraped poster with the matching upload function; True if every upload went through.'''
+    if poster.kind is TargetKind.COLLECTION:
+        return upload_collection_poster(poster, movies)
+    if poster.kind is TargetKind.MOVIE:
+        return upload_movie_poster(poster, movies)
+    return upload_tv_poster(poster, tv)
 
-    for poster in collectionposters:
-        upload_collection_poster(poster, movies)
-        
-    for poster in movieposters:
-        upload_movie_poster(poster, movies)
-    
-    for poster in showposters:
-        upload_tv_poster(poster, tv)
+
+def split_by_server(tv, movies):
+    '''Group library sections by Plex server: [(machineIdentifier, tv sections, movie sections)].'''
+    servers = {}
+    for sections, position in ((tv, 0), (movies, 1)):
+        for section in sections:
+            servers.setdefault(section._server.machineIdentifier, ([], []))[position].append(section)
+    if not servers:
+        return [(None, tv, movies)]
+    return [(server_id, server_tv, server_movies) for server_id, (server_tv, server_movies) in servers.items()]
+
+
+async def upload_all_async(posters, tv, movies):
+    '''Upload scraped posters to every server concurrently; posters for the same target are applied in order.'''
+    async with PosterUploader(tv, movies) as uploader:
+        for poster in posters:
+            await uploader.submit(poster)
+
+
+async def set_posters_async(url, tv, movies):
+    try:
+        scraped = await run_for_host(url, retry_transient, scrape, url, default=ParseError)
+    except PosterError as e:
+        print(f"Unable to scrape {url}: {e}")
+        run_errors.record(e, url)
+        return
+
+    movieposters, showposters, collectionposters = scraped
+    await upload_all_async(collectionposters + movieposters + showposters, tv, movies)
+
+
+def set_posters(url, tv, movies):
+    '''Scrape one set and upload its posters.'''
+    start_run()
+    run_async(set_posters_async(url, tv, movies))
 
 def scrape_posterdb_set_link(soup):
     try:
         view_all_div = soup.find('a', class_='rounded view_all')['href']
-    except:
+    except (TypeError, KeyError):
         return None
     return view_all_div
 
@@ -306,7 +1443,7 @@ def scrape_posterdb_set_link(soup):
 def scrape_posterdb_set_link(soup):
     try:
         view_all_div = soup.find("a", class_="rounded view_all")["href"]
-    except:
+    except (TypeError, KeyError):
         return None
     return view_all_div
 
@@ -318,7 +1455,7 @@ def scrape_posterd_user_info(soup):
         upload_count = int(number_str)
         pages = math.ceil(upload_count/24)
         return pages
-    except:
+    except (TypeError, KeyError, ValueError):
         return None
 
 def scrape_posterdb(soup):
@@ -347,7 +1484,7 @@ def scrape_posterdb(soup):
             title = title_p.split(" (")[0]
             try:
                 year = int(title_p.split(" (")[1].split(")")[0])
-            except:
+            except (IndexError, ValueError):
                 year = None
                 
             if " - " in title_p:
@@ -357,16 +1494,10 @@ def scrape_posterdb(soup):
                 elif "Season" in split_season:
                     season = int(split_season.split(" ")[1])
             else:
-                season = "Cover"
+                season = None
             
-            showposter = {}
-            showposter["title"] = title
-            showposter["url"] = poster_url
-            showposter["season"] = season
-            showposter["episode"] = None
-            showposter["year"] = year
-            showposter["source"] = "posterdb"
-            showposters.append(showposter)
+            kind = TargetKind.SHOW_COVER if season is None else TargetKind.SEASON_COVER
+            showposters.append(PosterRecord(kind, title, poster_url, "posterdb", year=year, season=season))
 
         elif media_type == "Movie":
             title_split = title_p.split(" (")
@@ -376,34 +1507,51 @@ def scrape_posterdb(soup):
                 title = title_split[0]
             year = title_split[-1].split(")")[0]
                 
-            movieposter = {}
-            movieposter["title"] = title
-            movieposter["url"] = poster_url
-            movieposter["year"] = int(year)
-            movieposter["source"] = "posterdb"
-            movieposters.append(movieposter)
+            movieposters.append(PosterRecord(TargetKind.MOVIE, title, poster_url, "posterdb", year=int(year)))
         
         elif media_type == "Collection":
-            collectionposter = {}
-            collectionposter["title"] = title_p
-            collectionposter["url"] = poster_url
-            collectionposter["source"] = "posterdb"
-            collectionposters.append(collectionposter)
+            collectionposters.append(PosterRecord(TargetKind.COLLECTION, title_p, poster_url, "posterdb"))
     
     return movieposters, showposters, collectionposters
 
 def get_mediux_filters():
-    config = json.load(open("config.json"))
-    return config.get("mediux_filters", None)
+    return get_config_setting("mediux_filters", None)
 
 
 def check_mediux_filter(mediux_filters, filter):
     return filter in mediux_filters if mediux_filters else True
 
-def scrape_mediux(soup):
+
+def get_mediux_quality_suffixes():
+    '''Image width/quality query for each kind of MediUX file ("mediux_quality" in config.json).'''
+    settings = get_config_setting("mediux_quality", None) or {}
+    suffixes = {}
+    for kind in TargetKind:
+        quality = {**DEFAULT_MEDIUX_QUALITY, **settings.get(kind.value, {})}
+        suffixes[kind] = f"&w={int(quality['width'])}&q={int(quality['quality'])}"
+    return suffixes
+
+def fetch_mediux_set_data(url):
+    '''Fetch a set's structured JSON from the MediUX API instead of scraping the rendered page.'''
+    set_id = re.search(r"/sets/(\d+)", url)
+    if set_id is None:
+        raise ValueError(f"No MediUX set id in {url}")
+    api_url = get_config_setting("mediux_api_url", "https://api.mediux.pro").rstrip("/")
+    response = json.loads(fetch_page(f"{api_url}/items/sets/{set_id.group(1)}?fields={MEDIUX_API_FIELDS}"))
+    return {"set": response["data"]}
+
+
+def scrape_mediux(page):
+    '''Scrape a MediUX set from its page (raw HTML or a BeautifulSoup).'''
+    if isinstance(page, BeautifulSoup):
+        page = "\n".join(script.text for script in page.find_all('script'))
+    return scrape_mediux_set(extract_mediux_set_data(page))
+
+
+def scrape_mediux_set(data_dict):
+    '''Build the poster lists from MediUX set data ({"set": {...}}), however it was fetched.'''
     base_url = "https://mediux.pro/_next/image?url=https%3A%2F%2Fapi.mediux.pro%2Fassets%2F"
-    quality_suffix = "&w=3840&q=80"
-    scripts = soup.find_all('script')
+    quality_suffixes = get_mediux_quality_suffixes()
     media_type = None
     showposters = []
     movieposters = []
@@ -412,101 +1560,86 @@ def scrape_mediux(soup):
     year = 0    # Default year value
     title = "Untitled" # Default title value
         
-    for script in scripts:
-        if 'files' in script.text:
-            if 'set' in script.text:
-                if 'Set Link\\' not in script.text:
-                    data_dict = parse_string_to_dict(script.text)
-                    poster_data = data_dict["set"]["files"]              
-
-    for data in poster_data:
-        if data["show_id"] is not None or data["show_id_backdrop"] is not None or data["episode_id"] is not None or data["season_id"] is not None or data["show_id"] is not None:
-            media_type = "Show"
-        else:
-            media_type = "Movie"
-                    
-    for data in poster_data:        
-        if media_type == "Show":
+    poster_data = data_dict["set"]["files"]
+    if not poster_data:
+        return movieposters, showposters, collectionposters
+
+    # The set's media type follows its last file
+    last_file = poster_data[-1]
+    if any(last_file[key] is not None for key in ("show_id", "show_id_backdrop", "episode_id", "season_id")):
+        media_type = "Show"
+    else:
+        media_type = "Movie"
 
-            episodes = data_dict["set"]["show"]["seasons"]
-            show_name = data_dict["set"]["show"]["name"]
-            try:
-                year = int(data_dict["set"]["show"]["first_air_date"][:4])
-            except:
-                year = None
+    # Per-set lookups, built once instead of scanning the season/movie lists for every file
+    if media_type == "Show":
+        show = data_dict["set"]["show"]
+        show_name = show["name"]
+        try:
+            year = int(show["first_air_date"][:4])
+        except (TypeError, ValueError):
+            year = None
+        season_numbers = {season["id"]: season["season_number"] for season in show["seasons"]}
+    else:
+        set_movie = data_dict["set"]["movie"]
+        set_collection = data_dict["set"]["collection"]
+        collection_movies = {movie["id"]: movie for movie in set_collection["movies"]} if set_collection else {}
 
+    for data in poster_data:        
+        if media_type == "Show":
             if data["fileType"] == "title_card":
-                episode_id = data["episode_id"]["id"]
                 season = data["episode_id"]["season_id"]["season_number"]
                 title = data["title"]
                 try:
                     episode = int(title.rsplit(" E",1)[1])
-                except:
+                except (IndexError, ValueError):
                     print(f"Error getting episode number for {title}.")
-                file_type = "title_card"
+                    run_errors.record(ParseError("no episode number in the title card's title"), title)
+                    continue
+                kind = TargetKind.TITLE_CARD
                 
             elif data["fileType"] == "backdrop":
-                season = "Backdrop"
+                season = None
                 episode = None
-                file_type = "background"
+                kind = TargetKind.BACKDROP
             elif data["season_id"] is not None:
-                season_id = data["season_id"]["id"]
-                season_data = [episode for episode in episodes if episode["id"] == season_id][0]
-                episode = "Cover"
-                season = season_data["season_number"]
-                file_type = "season_cover"
+                episode = None
+                season = season_numbers[data["season_id"]["id"]]
+                kind = TargetKind.SEASON_COVER
             elif data["show_id"] is not None:
-                season = "Cover"
+                season = None
                 episode = None
-                file_type = "show_cover"
+                kind = TargetKind.SHOW_COVER
 
         elif media_type == "Movie":
 
             if data["movie_id"]:
-                if data_dict["set"]["movie"]:
-                    title = data_dict["set"]["movie"]["title"]
-                    year = int(data_dict["set"]["movie"]["release_date"][:4])
-                elif data_dict["set"]["collection"]:
-                    movie_id = data["movie_id"]["id"]
-                    movies = data_dict["set"]["collection"]["movies"]
-                    movie_data = [movie for movie in movies if movie["id"] == movie_id][0]
+                if set_movie:
+                    title = set_movie["title"]
+                    year = int(set_movie["release_date"][:4])
+                elif set_collection:
+                    movie_data = collection_movies[data["movie_id"]["id"]]
                     title = movie_data["title"]
                     year = int(movie_data["release_date"][:4])
             elif data["collection_id"]:
-                title = data_dict["set"]["collection"]["collection_name"]
+                title = set_collection["collection_name"]
+            kind = TargetKind.COLLECTION if "Collection" in title else TargetKind.MOVIE
             
         image_stub = data["id"]
-        poster_url = f"{base_url}{image_stub}{quality_suffix}"
+        poster_url = f"{base_url}{image_stub}{quality_suffixes[kind]}"
         
         if media_type == "Show":
-            showposter = {}
-            showposter["title"] = show_name
-            showposter["season"] = season
-            showposter["episode"] = episode
-            showposter["url"] = poster_url
-            showposter["source"] = "mediux"
-            showposter["year"] = year
-
-            if check_mediux_filter(mediux_filters=mediux_filters, filter=file_type):
-                showposters.append(showposter)
+            if check_mediux_filter(mediux_filters=mediux_filters, filter=kind.value):
+                showposters.append(PosterRecord(kind, show_name, poster_url, "mediux", year=year, season=season, episode=episode))
             else:
-                print(f"{show_name} - skipping. '{file_type}' is not in 'mediux_filters'")
+                print(f"{show_name} - skipping. '{kind.value}' is not in 'mediux_filters'")
         
         elif media_type == "Movie":
-            if "Collection" in title:
-                collectionposter = {}
-                collectionposter["title"] = title
-                collectionposter["url"] = poster_url
-                collectionposter["source"] = "mediux"
-                collectionposters.append(collectionposter)
+            if kind is TargetKind.COLLECTION:
+                collectionposters.append(PosterRecord(TargetKind.COLLECTION, title, poster_url, "mediux"))
             
             else:
-                movieposter = {}
-                movieposter["title"] = title
-                movieposter["year"] = int(year)
-                movieposter["url"] = poster_url
-                movieposter["source"] = "mediux"
-                movieposters.append(movieposter)
+                movieposters.append(PosterRecord(TargetKind.MOVIE, title, poster_url, "mediux", year=int(year)))
             
     return movieposters, showposters, collectionposters
 
@@ -514,46 +1647,106 @@ def scrape_mediux(soup):
 def scrape(url):
     if ("theposterdb.com" in url):
         if("/set/" in url or "/user/" in url):
-            soup = cook_soup(url)
+            soup = cook_soup(url, parse_only=POSTERDB_STRAINER)
             return scrape_posterdb(soup)
         elif("/poster/" in url):
-            soup = cook_soup(url)
+            soup = cook_soup(url, parse_only=POSTERDB_STRAINER)
             set_url = scrape_posterdb_set_link(soup)
             if set_url is not None:
-                set_soup = cook_soup(set_url)
+                set_soup = cook_soup(set_url, parse_only=POSTERDB_STRAINER)
                 return scrape_posterdb(set_soup)
             else:
-                sys.exit("Poster set not found. Check the link you are inputting.")
+                raise NotFoundError("Poster set not found. Check the link you are inputting.")
             #menu_selection = input("You've provided the link to a single poster, rather than a set. \n \t 1. Upload entire set\n \t 2. Upload single poster \nType your selection: ")
     elif ("mediux.pro" in url) and ("sets" in url):
-        soup = cook_soup(url)
-        return scrape_mediux(soup)
+        if get_config_setting("mediux_backend", "html") == "api":
+            return scrape_mediux_set(fetch_mediux_set_data(url))
+        return scrape_mediux(fetch_page(url))
     elif (".html" in url):
         with open(url, 'r', encoding='utf-8') as file:
             html_content = file.read()
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=POSTERDB_STRAINER)
         return scrape_posterdb(soup)
     else:
-        sys.exit("Poster set not found. Check the link you are inputting.")
+        raise NotFoundError("Poster set not found. Check the link you are inputting.")
+
+
+def get_scrape_workers():
+    '''Number of pages fetched at the same time ("scrape_workers" in config.json).'''
+    try:
+        return max(1, int(get_config_setting("scrape_workers", 4)))
+    except (TypeError, ValueError):
+        return 4
 
 
-def scrape_entire_user(url):
-    '''Scrape all pages of a user's uploads.'''
-    soup = cook_soup(url) 
+def dedupe_posters(posters):
+    '''Drop repeated posters (same image for the same target), keeping the first occurrence.'''
+    return list(dict.fromkeys(posters))
+
+
+async def scrape_user_pages_async(url):
+    '''Fetch every page of a ThePosterDB user's uploads concurrently and return the deduplicated posters.'''
+    soup = await run_for_host(url, retry_transient, cook_soup, url, POSTERDB_STRAINER, default=ParseError)
     pages = scrape_posterd_user_info(soup)
     
     if not pages:
         print(f"Could not determine the number of pages for {url}")
-        return
+        return None
 
     if "?" in url:
         cleaned_url = url.split("?")[0]
         url = cleaned_url
-    
-    for page in range(pages):
+
+    def page_url(page):
+        return f"{url}?section=uploads&page={page + 1}"
+
+    def scrape_page(page):
         print(f"Scraping page {page + 1}.")
-        page_url = f"{url}?section=uploads&page={page + 1}"
-        set_posters(page_url, tv, movies)
+        return scrape_posterdb(cook_soup(page_url(page), parse_only=POSTERDB_STRAINER))
+
+    # "scrape_workers" pages at a time, still paced by the shared rate limiter
+    workers = asyncio.Semaphore(get_scrape_workers())
+
+    async def scrape_page_async(page):
+        async with workers:
+            return await run_for_host(url, retry_transient, scrape_page, page, default=ParseError)
+
+    # a failed page is recorded and skipped; the user's other pages are still uploaded
+    results = await asyncio.gather(*(scrape_page_async(page) for page in range(pages)), return_exceptions=True)
+
+    movieposters, showposters, collectionposters = [], [], []
+    for page, result in enumerate(results):
+        if isinstance(result, PosterError):
+            print(f"Unable to scrape page {page + 1} of {url}: {result}")
+            run_errors.record(result, page_url(page))
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        page_movies, page_shows, page_collections = result
+        movieposters.extend(page_movies)
+        showposters.extend(page_shows)
+        collectionposters.extend(page_collections)
+    return dedupe_posters(movieposters), dedupe_posters(showposters), dedupe_posters(collectionposters)
+
+
+async def scrape_entire_user_async(url, tv, movies):
+    try:
+        scraped = await scrape_user_pages_async(url)
+    except PosterError as e:
+        print(f"Unable to scrape {url}: {e}")
+        run_errors.record(e, url)
+        return
+    if scraped is None:
+        return
+
+    movieposters, showposters, collectionposters = scraped
+    await upload_all_async(collectionposters + movieposters + showposters, tv, movies)
+
+
+def scrape_entire_user(url, tv, movies):
+    '''Scrape all pages of a user's uploads, then upload them in one pass.'''
+    start_run()
+    run_async(scrape_entire_user_async(url, tv, movies))
 
 
 def is_not_comment(url):
@@ -564,48 +1757,343 @@ def is_not_comment(url):
 
 
 def parse_urls(bulk_import_list):
-    '''Parse the URLs from a list and scrape them.'''
+    '''Return the URLs from a list, skipping comments and empty lines.'''
     valid_urls = []
     for line in bulk_import_list:
         url = line.strip()
         if url and not url.startswith(("#", "//")):
             valid_urls.append(url)
 
-    for url in valid_urls:
-        if "/user/" in url: 
-            print(f"Scraping user data from: {url}")
-            scrape_entire_user(url)
-        else:
-            print(f"Returning non-user URL: {url}")
-            # If it's not a /user/ URL, return it as before
-            return valid_urls
-
     return valid_urls
 
 
-def parse_cli_urls(file_path, tv, movies):
-    '''Parse the URLs from a file and scrape them.'''
+def get_pipeline_queue_size():
+    '''Maximum number of scraped posters waiting for upload in bulk mode ("pipeline_queue_size" in config.json).'''
+    try:
+        return max(1, int(get_config_setting("pipeline_queue_size", 500)))
+    except (TypeError, ValueError):
+        return 500
+
+
+async def scrape_url_posters_async(url):
+    '''Scrape a set or user URL into one poster list (collections, movies, then shows); [] if it fails.'''
+    try:
+        if "/user/" in url:
+            scraped = await scrape_user_pages_async(url)
+        else:
+            scraped = await run_for_host(url, retry_transient, scrape, url, default=ParseError)
+    except PosterError as e:
+        print(f"Unable to scrape {url}: {e}")
+        run_errors.record(e, url)
+        return []
+    if scraped is None:
+        return []
+    movieposters, showposters, collectionposters = scraped
+    return collectionposters + movieposters + showposters
+
+
+def plan_uploads(scraped_sets, source_priority=None):
+    '''Keep one poster per Plex target across sets: the most preferred source wins, then the latest set in file order.'''
+    source_priority = source_priority or []
+    # a title scraped without a year stands for the same item as its one dated version, if there is exactly one
+    years = {}
+    for posters in scraped_sets:
+        for poster in posters:
+            if poster.year is not None:
+                years.setdefault(poster.upload_key, set()).add(poster.year)
+
+    winners = {}
+    order = 0
+    for posters in scraped_sets:
+        for poster in posters:
+            target = poster.target
+            if poster.year is None and len(years.get(poster.upload_key, ())) == 1:
+                kind, title, _, season, episode = target
+                target = (kind, title, next(iter(years[poster.upload_key])), season, episode)
+            preference = len(source_priority) - source_priority.index(poster.source) if poster.source in source_priority else 0
+            rank = (preference, order)
+            order += 1
+            current = winners.get(target)
+            if current is None or rank > current[0]:
+                winners[target] = (rank, poster)
+    return [poster for _, poster in winners.values()]
+
+
+async def plan_bulk_uploads_async(urls, on_progress=None, dedupe=True):
+    '''Scrape every URL ("scrape_workers" at a time), then collapse overlapping sets into one upload per target.'''
+    workers = asyncio.Semaphore(get_scrape_workers())
+
+    async def scrape_numbered(i, url):
+        async with workers:
+            if on_progress:
+                on_progress(i, url)
+            return await scrape_url_posters_async(url)
+
+    scraped_sets = await asyncio.gather(*(scrape_numbered(i, url) for i, url in enumerate(urls)))
+
+    if not dedupe:
+        return dedupe_posters(poster for posters in scraped_sets for poster in posters)
+    planned = plan_uploads(scraped_sets, get_config_setting("source_priority", None))
+    print(f"Planned {len(planned)} uploads from {sum(len(posters) for posters in scraped_sets)} scraped posters.")
+    return planned
+
+
+class BulkCheckpoint:
+    '''Append-only record of the URLs and posters a bulk run has finished, so an interrupted run can resume.'''
+
+    def __init__(self, path, bulk_file, resume=False):
+        self.lock = threading.Lock()
+        self.completed_urls = set()
+        self.completed_posters = set()
+
+        entries = []
+        if resume and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as checkpoint_file:
+                entries = [json.loads(line) for line in checkpoint_file if line.strip()]
+            if not entries or entries[0].get("bulk_file") != bulk_file:
+                print("No checkpoint for this bulk file, starting from the beginning.")
+                entries = []
+
+        for entry in entries[1:]:
+            if "url" in entry:
+                self.completed_urls.add(entry["url"])
+            elif "poster" in entry:
+                self.completed_posters.add(tuple(entry["poster"]))
+        if entries:
+            print(f"Resuming: {len(self.completed_urls)} URLs and {len(self.completed_posters)} posters already done.")
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a" if entries else "w", encoding="utf-8")
+        if not entries:
+            self._write({"bulk_file": bulk_file})
+
+    @staticmethod
+    def _poster_key(poster):
+        return (poster.kind.value, poster.title, poster.year, poster.season, poster.episode, poster.url)
+
+    def _write(self, entry):
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    def is_url_done(self, url):
+        return url in self.completed_urls
+
+    def is_poster_done(self, poster):
+        return self._poster_key(poster) in self.completed_posters
+
+    def url_done(self, url):
+        self.completed_urls.add(url)
+        self._write({"url": url})
+
+    def poster_done(self, poster):
+        key = self._poster_key(poster)
+        self.completed_posters.add(key)
+        self._write({"poster": list(key)})
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+async def bulk_pipeline_async(urls, tv, movies, on_progress=None, checkpoint=None):
+    if get_config_setting("bulk_dedupe", False):
+        # Every URL is re-scraped (from the page cache) so planning sees all sets; finished posters are skipped
+        async with PosterUploader(tv, movies, checkpoint) as uploader:
+            for poster in await plan_bulk_uploads_async(urls, on_progress):
+                if checkpoint is None or not checkpoint.is_poster_done(poster):
+                    await uploader.submit(poster)
+        return
+
+    # Without planning, the next URLs are scraped while earlier ones upload. Uploads are still queued
+    # in file order, so when sets overlap the later one is applied last.
+    pending_urls = iter(enumerate(urls))
+    scraping = []
+
+    def scrape_next():
+        for i, url in pending_urls:
+            if checkpoint is not None and checkpoint.is_url_done(url):
+                continue
+            if on_progress:
+                on_progress(i, url)
+            scraping.append((url, asyncio.create_task(scrape_url_posters_async(url))))
+            return
+
+    async def finish_url(url, uploads):
+        results = await asyncio.gather(*uploads, return_exceptions=True)
+        if all(result is True for result in results):
+            checkpoint.url_done(url)
+
+    finishing = []
+    async with PosterUploader(tv, movies, checkpoint, max_pending=get_pipeline_queue_size()) as uploader:
+        for _ in range(get_scrape_workers()):
+            scrape_next()
+        while scraping:
+            url, scraped = scraping.pop(0)
+            scrape_next()
+            posters = await scraped
+            uploads = [
+                await uploader.submit(poster)
+                for poster in posters if checkpoint is None or not checkpoint.is_poster_done(poster)
+            ]
+            # a URL that failed to scrape (no posters) is left for the next --resume
+            if checkpoint is not None and posters:
+                finishing.append(asyncio.create_task(finish_url(url, uploads)))
+    await asyncio.gather(*finishing)
+
+
+def run_bulk_pipeline(urls, tv, movies, on_progress=None, checkpoint=None):
+    '''Upload the posters of many URLs, deduplicated across sets ("bulk_dedupe") or streamed while scraping.'''
+    run_async(bulk_pipeline_async(urls, tv, movies, on_progress, checkpoint))
+
+
+def read_bulk_file(file_path):
+    '''Return the URLs listed in a bulk import file, or None if it does not exist.'''
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
             urls = file.readlines()
-        for url in urls:
-            url = url.strip()
-            if is_not_comment(url):
-                if "/user/" in url:
-                    scrape_entire_user(url)
-                else:
-                    set_posters(url, tv, movies)
     except FileNotFoundError:
         print("File not found. Please enter a valid file path.")
+        return None
+
+    return [url.strip() for url in urls if is_not_comment(url.strip())]
+
+
+def parse_cli_urls(file_path, tv, movies, resume=False):
+    '''Parse the URLs from a file and scrape them, checkpointing progress so --resume can skip finished work.'''
+    urls = read_bulk_file(file_path)
+    if urls is None:
+        return
+
+    start_run()
+    run_errors.clear()
+    checkpoint = BulkCheckpoint(get_config_setting("checkpoint_file", "cache/bulk_checkpoint.jsonl"), os.path.abspath(file_path), resume)
+    try:
+        run_bulk_pipeline(urls, tv, movies, checkpoint=checkpoint)
+    finally:
+        checkpoint.close()
+    print(run_errors.summary())
+
+
+def resolve_poster_targets(poster, tv, movies):
+    '''Return the Plex items (one per matching library) a poster would be uploaded to.'''
+    if poster.kind is TargetKind.COLLECTION:
+        return find_collection(movies, poster) or []
+    if poster.kind is TargetKind.MOVIE:
+        return find_in_library(movies, poster) or []
+
+    targets = []
+    resolve_target = TV_UPLOAD_TARGETS[poster.kind]
+    for tv_show in find_in_library(tv, poster) or []:
+        try:
+            targets.append(resolve_target(tv_show, poster))
+        except Exception:
+            print(f"{poster.label} not found in {tv_show.librarySectionTitle} library, skipping.")
+    return targets
+
+
+def plan_entry(poster, target=None):
+    '''One line of a plan file: the poster and the Plex item it resolves to (rating_key is null if unresolved).'''
+    return {
+        "server": target._server.machineIdentifier if target is not None else None,
+        "rating_key": str(target.ratingKey) if target is not None else None,
+        "library": target.librarySectionTitle if target is not None else None,
+        "kind": poster.kind.value,
+        "title": poster.title,
+        "year": poster.year,
+        "season": poster.season,
+        "episode": poster.episode,
+        "url": poster.url,
+        "source": poster.source,
+    }
+
+
+def write_plan(file_path, plan_file, tv, movies):
+    '''Scrape and resolve a bulk file without uploading, writing the resulting plan as JSON lines.'''
+    urls = read_bulk_file(file_path)
+    if urls is None:
+        return
+
+    async def plan_targets():
+        posters = await plan_bulk_uploads_async(urls, dedupe=get_config_setting("bulk_dedupe", False))
+        lookups = asyncio.Semaphore(get_upload_workers())
+
+        async def resolve(poster):
+            async with lookups:
+                return await asyncio.to_thread(resolve_poster_targets, poster, tv, movies)
+
+        return posters, await asyncio.gather(*(resolve(poster) for poster in posters))
+
+    posters, resolved = run_async(plan_targets())
+
+    target_count = 0
+    unresolved_titles = set()
+    with open(plan_file, "w", encoding="utf-8") as plan:
+        for poster, targets in zip(posters, resolved):
+            if not targets:
+                unresolved_titles.add(poster.title)
+                plan.write(json.dumps(plan_entry(poster)) + "\n")
+            for target in targets:
+                target_count += 1
+                plan.write(json.dumps(plan_entry(poster, target)) + "\n")
+
+    unresolved = sum(1 for targets in resolved if not targets)
+    print(f"Wrote {target_count} uploads to {plan_file}. {unresolved} posters ({len(unresolved_titles)} titles) could not be resolved.")
+
+
+def apply_plan(plan_file, servers):
+    '''Upload the resolved entries of a plan file written by write_plan to the Plex servers they were planned for.'''
+    try:
+        with open(plan_file, "r", encoding="utf-8") as plan:
+            entries = [json.loads(line) for line in plan if line.strip()]
+    except FileNotFoundError:
+        print("Plan file not found. Please enter a valid file path.")
+        return
+
+    servers = {server.machineIdentifier: server for server in servers}
+
+    def apply_entry(entry):
+        server = servers[entry["server"]]
+        poster = PosterRecord(TargetKind(entry["kind"]), entry["title"], entry["url"], entry["source"],
+                              year=entry["year"], season=entry["season"], episode=entry["episode"])
+        try:
+            target = retry_transient(server.fetchItem, int(entry["rating_key"]), default=NotFoundError)
+            if retry_transient(apply_upload, target, poster, poster.kind is TargetKind.BACKDROP):
+                print(f"Uploaded {poster.describe()} in {entry['library']} library.")
+            else:
+                print(f"Skipped {poster.describe()} in {entry['library']} library, already applied.")
+        except NotFoundError as e:
+            print(f"{poster.label} not found in {entry['library']} library, skipping.")
+            run_errors.record(e, f"{poster.label} ({entry['library']})")
+        except PosterError as e:
+            print(f"Unable to upload {poster.describe()} in {entry['library']} library: {e}")
+            run_errors.record(e, f"{poster.label} ({entry['library']})")
+
+    async def apply_entries():
+        # each server uploads in parallel with the others, within its own "upload_workers"
+        uploaders = {server_id: AsyncUploader(server_upload_workers.get(server_id)) for server_id in servers}
+        for entry in entries:
+            if entry["rating_key"] is None:
+                continue
+            if entry["server"] not in servers:
+                print(f"Skipping {entry['title']}: planned for another Plex server.")
+                continue
+            art = entry["kind"] == TargetKind.BACKDROP.value
+            await uploaders[entry["server"]].submit((entry["rating_key"], art), apply_entry, entry)
+        await asyncio.gather(*(uploader.wait() for uploader in uploaders.values()))
+
+    run_errors.clear()
+    run_async(apply_entries())
+    print(run_errors.summary())
 
 
 def cleanup():
     '''Function to handle cleanup tasks on exit.'''
+    close_image_pool()
     if plex:
         print("Closing Plex server connection...")
     print("Exiting application. Cleanup complete.")
-    
-atexit.register(cleanup)
 
 #@ ---------------------- GUI FUNCTIONS ----------------------
 
@@ -719,6 +2207,7 @@ def load_config(config_path="config.json"):
         bulk_txt = config.get("bulk_txt", "bulk_import.txt")
 
         return {
+            **config,
             "base_url": base_url,
             "token": token,
             "tv_library": tv_library,
@@ -733,14 +2222,16 @@ def load_config(config_path="config.json"):
 def save_config():
     '''Save the configuration from the UI fields to the file and update the in-memory config.'''
 
-    new_config = {
+    # Keep settings that are not editable in the GUI (e.g. upload_workers)
+    new_config = load_config()
+    new_config.update({
         "base_url": base_url_entry.get().strip(),
         "token": token_entry.get().strip(),
         "tv_library": [item.strip() for item in tv_library_text.get().strip().split(",")],
         "movie_library": [item.strip() for item in movie_library_text.get().strip().split(",")],
         "mediux_filters": mediux_filters_text.get().strip().split(", "), 
         "bulk_txt": bulk_txt_entry.get().strip()
-    }
+    })
 
     try:
         with open("config.json", "w") as f:
@@ -836,12 +2327,20 @@ def process_scrape_url(url):
             update_status("Plex setup incomplete. Please configure your settings.", color="red")
             return
 
-        soup = cook_soup(url)
         update_status(f"Scraping: {url}", color="#E5A00D")
         
         # Proceed with setting posters
-        set_posters(url, tv, movies)
-        update_status(f"Posters successfully set for: {url}", color="#E5A00D")
+        run_errors.clear()
+        if "/user/" in url:
+            scrape_entire_user(url, tv, movies)
+        else:
+            set_posters(url, tv, movies)
+
+        print(run_errors.summary())
+        if run_errors.errors:
+            update_status(f"Completed {url} with {len(run_errors.errors)} errors, see the log for details.", color="red")
+        else:
+            update_status(f"Posters successfully set for: {url}", color="#E5A00D")
 
     except Exception as e:
         update_status(f"Error: {e}", color="red")
@@ -863,13 +2362,17 @@ def process_bulk_import(valid_urls):
             update_status("Plex setup incomplete. Please configure your settings.", color="red")
             return
 
-        for i, url in enumerate(valid_urls):
-            status_text = f"Processing item {i+1} of {len(valid_urls)}: {url}"
-            update_status(status_text, color="#E5A00D")
-            set_posters(url, tv, movies)
-            update_status(f"Completed: {url}", color="#E5A00D")
+        def report_progress(i, url):
+            update_status(f"Processing item {i+1} of {len(valid_urls)}: {url}", color="#E5A00D")
+
+        run_errors.clear()
+        run_bulk_pipeline(valid_urls, tv, movies, on_progress=report_progress)
 
-        update_status("Bulk import scraping completed.", color="#E5A00D")
+        print(run_errors.summary())
+        if run_errors.errors:
+            update_status(f"Bulk import completed with {len(run_errors.errors)} errors, see the log for details.", color="red")
+        else:
+            update_status("Bulk import scraping completed.", color="#E5A00D")
     except Exception as e:
         update_status(f"Error during bulk import: {e}", color="red")
     finally:
@@ -1273,7 +2776,7 @@ def interactive_cli_loop(tv, movies, bulk_txt):
             url = input("Enter the URL: ")
             if check_libraries(tv, movies):
                 if "/user/" in url.lower():
-                    scrape_entire_user(url)
+                    scrape_entire_user(url, tv, movies)
                 else:
                     set_posters(url, tv, movies)
 
@@ -1307,6 +2810,9 @@ def check_libraries(tv, movies):
 
 # * Main Initialization ---
 if __name__ == "__main__":
+    multiprocessing.freeze_support()   # the image pool's workers re-run this script in the PyInstaller build
+    # registered here, not at import, so the image pool's spawned workers don't run the app's exit handler
+    atexit.register(cleanup)
     config = load_config() 
     bulk_txt = config.get("bulk_txt", "bulk_import.txt")
     
@@ -1321,15 +2827,28 @@ if __name__ == "__main__":
 
         elif command == 'bulk':
             tv, movies = plex_setup(gui_mode=False)
-            if len(sys.argv) > 2:
-                file_path = sys.argv[2]
-                parse_cli_urls(file_path, tv, movies)
+            resume = "--resume" in sys.argv
+            args = [arg for arg in sys.argv[2:] if arg != "--resume"]
+            if args:
+                file_path = args[0]
+                parse_cli_urls(file_path, tv, movies, resume=resume)
             else:
                 print(f"Using bulk import file: {bulk_txt}")
-                parse_cli_urls(bulk_txt, tv, movies)
+                parse_cli_urls(bulk_txt, tv, movies, resume=resume)
+
+        elif command == 'plan':
+            tv, movies = plex_setup(gui_mode=False)
+            file_path = sys.argv[2] if len(sys.argv) > 2 else bulk_txt
+            plan_file = sys.argv[3] if len(sys.argv) > 3 else "plan.jsonl"
+            write_plan(file_path, plan_file, tv, movies)
+
+        elif command == 'apply':
+            plex_setup(gui_mode=False)
+            apply_plan(sys.argv[2] if len(sys.argv) > 2 else "plan.jsonl", plex_servers)
 
         elif "/user/" in command:
-            scrape_entire_user(command)
+            tv, movies = plex_setup(gui_mode=False)
+            scrape_entire_user(command, tv, movies)
         else:
             tv, movies = plex_setup(gui_mode=False)
             set_posters(command, tv, movies)
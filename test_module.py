@@ -1,5 +1,16 @@
 import plex_poster_set_helper
+import asyncio
+import hashlib
+import http.server
+import json
+import plexapi.exceptions
 import pytest
+import requests
+import threading
+import time
+from bs4 import BeautifulSoup
+from PIL import Image
+from plex_poster_set_helper import PosterRecord, TargetKind
 
 def test_scrapeposterdb_set_tv_series():
     soup = plex_poster_set_helper.cook_soup("https://theposterdb.com/set/8846")
@@ -8,11 +19,11 @@ def test_scrapeposterdb_set_tv_series():
     assert len(collectionposters) == 0
     assert len(showposters) == 10
     for showposter in showposters:
-        assert showposter["title"] == "Brooklyn Nine-Nine"
-        assert showposter["year"] == 2013
-        assert showposter["episode"] == None
-        assert showposter["season"] == "Cover" or (showposter["season"] >= 0 and showposter["season"] <= 8) 
-        assert showposter["source"] == "posterdb"
+        assert showposter.title == "Brooklyn Nine-Nine"
+        assert showposter.year == 2013
+        assert showposter.episode == None
+        assert showposter.kind is TargetKind.SHOW_COVER or (showposter.kind is TargetKind.SEASON_COVER and showposter.season >= 0 and showposter.season <= 8) 
+        assert showposter.source == "posterdb"
         
 def test_scrapeposterdb_set_movie_collection():
     soup = plex_poster_set_helper.cook_soup("https://theposterdb.com/set/13035")
@@ -21,8 +32,8 @@ def test_scrapeposterdb_set_movie_collection():
     assert len(collectionposters) == 1
     assert len(showposters) == 0
     for collectionposter in collectionposters:
-        assert collectionposter["title"] == "The Dark Knight Collection"
-        assert collectionposter["source"] == "posterdb"
+        assert collectionposter.title == "The Dark Knight Collection"
+        assert collectionposter.source == "posterdb"
         
 def test_scrape_mediux_set_tv_series():
     soup = plex_poster_set_helper.cook_soup("https://mediux.pro/sets/9242")
@@ -34,16 +45,16 @@ def test_scrape_mediux_set_tv_series():
     episode_count = 0
     cover_count = 0
     for showposter in showposters:
-        assert showposter["title"] == "Mr. & Mrs. Smith"
-        assert showposter["year"] == 2024
-        assert showposter["source"] == "mediux"
-        if (isinstance(showposter["episode"], int)):
+        assert showposter.title == "Mr. & Mrs. Smith"
+        assert showposter.year == 2024
+        assert showposter.source == "mediux"
+        if showposter.kind is TargetKind.TITLE_CARD:
             episode_count+=1
-        elif showposter["episode"] == "Cover":
+        elif showposter.kind is TargetKind.SEASON_COVER:
             cover_count+=1
-        elif showposter["season"] == "Cover":
+        elif showposter.kind is TargetKind.SHOW_COVER:
             cover_count+=1
-        elif showposter["season"] == "Backdrop":
+        elif showposter.kind is TargetKind.BACKDROP:
             backdrop_count+=1
     assert backdrop_count == 1
     assert episode_count == 8
@@ -59,16 +70,16 @@ def test_scrape_mediux_set_tv_series_long():
     episode_count = 0
     cover_count = 0
     for showposter in showposters:
-        assert showposter["title"] == "Modern Family"
-        assert showposter["year"] == 2009
-        assert showposter["source"] == "mediux"
-        if (isinstance(showposter["episode"], int)):
+        assert showposter.title == "Modern Family"
+        assert showposter.year == 2009
+        assert showposter.source == "mediux"
+        if showposter.kind is TargetKind.TITLE_CARD:
             episode_count+=1
-        elif showposter["episode"] == "Cover":
+        elif showposter.kind is TargetKind.SEASON_COVER:
             cover_count+=1
-        elif showposter["season"] == "Cover":
+        elif showposter.kind is TargetKind.SHOW_COVER:
             cover_count+=1
-        elif showposter["season"] == "Backdrop":
+        elif showposter.kind is TargetKind.BACKDROP:
             backdrop_count+=1
     assert backdrop_count == 1
     assert episode_count == 250
@@ -84,20 +95,809 @@ def test_scrape_mediux_boxset():
     episode_count = 0
     cover_count = 0
     for showposter in showposters:
-        assert showposter["title"] == "Doctor Who"
-        assert showposter["year"] == 2005
-        assert showposter["source"] == "mediux"
-        if (isinstance(showposter["episode"], int)):
+        assert showposter.title == "Doctor Who"
+        assert showposter.year == 2005
+        assert showposter.source == "mediux"
+        if showposter.kind is TargetKind.TITLE_CARD:
             episode_count+=1
-        elif showposter["episode"] == "Cover":
+        elif showposter.kind is TargetKind.SEASON_COVER:
             cover_count+=1
-        elif showposter["season"] == "Cover":
+        elif showposter.kind is TargetKind.SHOW_COVER:
             cover_count+=1
-        elif showposter["season"] == "Backdrop":
+        elif showposter.kind is TargetKind.BACKDROP:
             backdrop_count+=1
     assert backdrop_count == 0
     assert episode_count == 232
     assert cover_count == 15
 
+class FakeServer:
+    machineIdentifier = "test-server"
+
+class FakeItem:
+    def __init__(self, title, year):
+        self.title = title
+        self.year = year
+        self.librarySectionTitle = "TV Shows"
+
+class FakeSection:
+    _server = FakeServer()
+    key = 1
+
+    def __init__(self, items):
+        self.items = items
+        self.listings = 0
+        self.searches = 0
+
+    def all(self):
+        self.listings += 1
+        return self.items
+
+    def get(self, title, **kwargs):
+        self.searches += 1
+        raise plexapi.exceptions.NotFound(title)
+
+    def collections(self):
+        self.listings += 1
+        return self.items
+
+def test_config_is_read_once_per_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(plex_poster_set_helper, "config_settings", None)
+    (tmp_path / "config.json").write_text('{"upload_workers": 2}')
+    assert plex_poster_set_helper.get_upload_workers() == 2
+
+    # a rewrite mid-run (e.g. the GUI saving settings) is picked up by the next run only
+    (tmp_path / "config.json").write_text('{"upload_workers": ')
+    assert plex_poster_set_helper.get_upload_workers() == 2
+    (tmp_path / "config.json").write_text('{"upload_workers": 6}')
+    plex_poster_set_helper.load_settings()
+    assert plex_poster_set_helper.get_upload_workers() == 6
+
+def test_each_run_rereads_config_and_indexes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(plex_poster_set_helper, "config_settings", None)
+    plex_poster_set_helper.reset_library_indexes()
+    section = FakeSection([])
+    seen = []
+
+    async def set_posters_async(url, tv, movies):
+        seen.append((plex_poster_set_helper.get_mediux_filters(), plex_poster_set_helper.find_in_library([section], PosterRecord(TargetKind.MOVIE, "Alien", "", "mediux"))))
+
+    monkeypatch.setattr(plex_poster_set_helper, "set_posters_async", set_posters_async)
+    # two runs of the interactive CLI, with config.json and the library changed in between
+    (tmp_path / "config.json").write_text('{"mediux_filters": ["title_card"]}')
+    plex_poster_set_helper.set_posters("https://mediux.pro/sets/1", [], [section])
+    (tmp_path / "config.json").write_text('{"mediux_filters": ["show_cover"]}')
+    section.items.append(FakeItem("Alien", 1979))
+    plex_poster_set_helper.set_posters("https://mediux.pro/sets/1", [], [section])
+    assert [(filters, found is not None) for filters, found in seen] == [(["title_card"], False), (["show_cover"], True)]
+
+def test_find_in_library_uses_index():
+    plex_poster_set_helper.reset_library_indexes()
+    section = FakeSection([FakeItem("Mr. & Mrs. Smith", 2024), FakeItem("Doctor Who", 2005), FakeItem("Doctor Who", 1963)])
+    for _ in range(3):
+        items = plex_poster_set_helper.find_in_library([section], PosterRecord(TargetKind.SHOW_COVER, "Mr and Mrs Smith", "", "mediux", year=2024))
+        assert items[0].title == "Mr. & Mrs. Smith"
+    assert plex_poster_set_helper.find_in_library([section], PosterRecord(TargetKind.SHOW_COVER, "Doctor Who", "", "mediux", year=1963))[0].year == 1963
+    assert plex_poster_set_helper.find_in_library([section], PosterRecord(TargetKind.MOVIE, "Missing", "", "mediux")) is None
+    assert plex_poster_set_helper.find_in_library([section], PosterRecord(TargetKind.MOVIE, "Missing", "", "mediux")) is None
+    assert section.listings == 1
+    assert section.searches == 1
+
+def test_library_index_listing_does_not_block_other_sections():
+    plex_poster_set_helper.reset_library_indexes()
+    listing = threading.Event()
+    release = threading.Event()
+
+    class SlowSection(FakeSection):
+        key = 2
+
+        def all(self):
+            listing.set()
+            release.wait(5)
+            return super().all()
+
+    slow = SlowSection([FakeItem("Doctor Who", 2005)])
+    fast = FakeSection([FakeItem("Archer", 2009)])
+    worker = threading.Thread(target=plex_poster_set_helper.get_library_index, args=(slow,))
+    worker.start()
+    assert listing.wait(5)
+    # the other section is indexed while the slow one is still listing
+    assert plex_poster_set_helper.lookup_library_item(fast, "Archer", 2009).title == "Archer"
+    release.set()
+    worker.join()
+    assert plex_poster_set_helper.lookup_library_item(slow, "Doctor Who", 2005).title == "Doctor Who"
+
+def test_find_collection_uses_index():
+    plex_poster_set_helper.reset_library_indexes()
+    section = FakeSection([FakeItem("The Dark Knight Collection", None)])
+    for _ in range(3):
+        assert plex_poster_set_helper.find_collection([section], PosterRecord(TargetKind.COLLECTION, "The Dark Knight Collection", "", "mediux"))[0].title == "The Dark Knight Collection"
+    assert section.listings == 1
+
+    # a missing collection re-lists the section once per run in case it was created mid-run
+    section.items = section.items + [FakeItem("Alien Collection", None)]
+    assert plex_poster_set_helper.find_collection([section], PosterRecord(TargetKind.COLLECTION, "Alien Collection", "", "mediux"))[0].title == "Alien Collection"
+    for n in range(50):
+        assert plex_poster_set_helper.find_collection([section], PosterRecord(TargetKind.COLLECTION, f"Missing Collection {n}", "", "mediux")) is None
+    assert section.listings == 2
+
+class FakeSeasonOrEpisode:
+    def __init__(self, index, parentIndex=None):
+        self.index = index
+        self.parentIndex = parentIndex
+
+class FakeShow(FakeItem):
+    _server = FakeServer()
+    ratingKey = 42
+
+    def __init__(self):
+        super().__init__("Modern Family", 2009)
+        self.fetches = 0
+
+    def seasons(self):
+        self.fetches += 1
+        time.sleep(0.01)
+        return [FakeSeasonOrEpisode(0), FakeSeasonOrEpisode(1), FakeSeasonOrEpisode(2)]
+
+    def episodes(self):
+        self.fetches += 1
+        return [FakeSeasonOrEpisode(episode, season) for season in (1, 2) for episode in range(1, 25)]
+
+def test_show_tree_is_fetched_once():
+    plex_poster_set_helper.reset_library_indexes()
+    show = FakeShow()
+    assert plex_poster_set_helper.get_season(show, 0).index == 0
+    for season in (1, 2):
+        assert plex_poster_set_helper.get_season(show, season).index == season
+        for episode in range(1, 25):
+            target = plex_poster_set_helper.get_episode(show, season, episode)
+            assert (target.parentIndex, target.index) == (season, episode)
+    with pytest.raises(plexapi.exceptions.NotFound):
+        plex_poster_set_helper.get_episode(show, 3, 1)
+    assert show.fetches == 2
+
+    # uploads racing for the same show share one fetch
+    plex_poster_set_helper.reset_library_indexes()
+    show = FakeShow()
+    workers = [threading.Thread(target=plex_poster_set_helper.get_episode, args=(show, 1, n)) for n in range(1, 5)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert show.fetches == 2
+
+def test_async_uploader_keeps_target_order():
+    applied = []
+    running = set()
+    lock = threading.Lock()
+
+    def upload(target, n):
+        with lock:
+            assert target not in running
+            running.add(target)
+        time.sleep(0.001)
+        with lock:
+            running.discard(target)
+            applied.append((target, n))
+
+    async def submit_all():
+        async with plex_poster_set_helper.AsyncUploader(max_workers=4) as uploader:
+            for n in range(20):
+                for target in ("a", "b", "c"):
+                    await uploader.submit(target, upload, target, n)
+
+    plex_poster_set_helper.run_async(submit_all())
+
+    assert len(applied) == 60
+    for target in ("a", "b", "c"):
+        assert [n for t, n in applied if t == target] == list(range(20))
+
+def test_host_limits_cap_requests_per_site(config):
+    config.update({"host_concurrency": {"theposterdb.com": 2}})
+    running = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def fetch(host):
+        with lock:
+            running[host] = running.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), running[host])
+        time.sleep(0.02)
+        with lock:
+            running[host] -= 1
+
+    async def fetch_all():
+        await asyncio.gather(*(
+            plex_poster_set_helper.run_for_host(f"https://{host}/sets/{n}", fetch, host)
+            for n in range(8) for host in ("theposterdb.com", "mediux.pro")
+        ))
+
+    plex_poster_set_helper.run_async(fetch_all())
+    assert peak["theposterdb.com"] == 2
+    assert peak["mediux.pro"] > 2
+
+def test_rate_limiter_token_bucket():
+    limiter = plex_poster_set_helper.RateLimiter({"theposterdb.com": (20, 3)})
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire("https://theposterdb.com/api/assets/1")
+    assert time.monotonic() - start < 0.05    # burst
+    for _ in range(4):
+        limiter.acquire("https://theposterdb.com/api/assets/1")
+    assert time.monotonic() - start >= 0.15   # then 20 per second
+    limiter.backoff("https://theposterdb.com/set/1", 0.2)
+    before = time.monotonic()
+    limiter.acquire("https://theposterdb.com/set/1")
+    assert time.monotonic() - before >= 0.19
+    before = time.monotonic()
+    limiter.acquire("https://mediux.pro/sets/1")   # unlimited host
+    assert time.monotonic() - before < 0.05
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    pages = {}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        body, etag = self.pages.get(self.path) or self.pages[self.path.split("?")[0]]
+        if isinstance(body, int):
+            self.send_response(body)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def config(monkeypatch):
+    '''The settings get_config_setting returns during a test, instead of config.json.'''
+    settings = {}
+    monkeypatch.setattr(plex_poster_set_helper, "config_settings", settings)
+    return settings
+
+@pytest.fixture
+def fixture_server():
+    FixtureHandler.pages = {}
+    FixtureHandler.requests = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_page_cache_revalidates_with_etag(fixture_server, tmp_path, monkeypatch):
+    cache = plex_poster_set_helper.PageCache(str(tmp_path / "pages.sqlite3"), ttl=0, max_bytes=512)
+    monkeypatch.setattr(plex_poster_set_helper, "page_cache", cache)
+    FixtureHandler.pages["/set/1"] = ("<html>set one</html>", '"v1"')
+
+    assert plex_poster_set_helper.fetch_page(fixture_server + "/set/1") == "<html>set one</html>"
+    assert plex_poster_set_helper.fetch_page(fixture_server + "/set/1") == "<html>set one</html>"
+    assert FixtureHandler.requests == [("/set/1", None), ("/set/1", '"v1"')]
+
+    cache.ttl = 3600
+    assert plex_poster_set_helper.fetch_page(fixture_server + "/set/1") == "<html>set one</html>"
+    assert len(FixtureHandler.requests) == 2
+
+    # pages beyond max_bytes push out the least recently used one
+    FixtureHandler.pages["/set/2"] = ("x" * 500, '"v2"')
+    plex_poster_set_helper.fetch_page(fixture_server + "/set/2")
+    assert cache.get(fixture_server + "/set/1") is None
+    assert cache.get(fixture_server + "/set/2") is not None
+
+def test_page_fetch_retries_only_in_the_session(fixture_server, monkeypatch, config):
+    config.update({"request_retries": 1, "error_retries": 2, "page_cache": {"enabled": False}})
+    monkeypatch.setattr(plex_poster_set_helper, "page_cache", None)
+    monkeypatch.setattr(plex_poster_set_helper, "http_session", None)
+    monkeypatch.setattr(plex_poster_set_helper.time, "sleep", lambda seconds: None)
+    FixtureHandler.pages["/set/down"] = (503, None)
+
+    with pytest.raises(plex_poster_set_helper.NetworkError):
+        plex_poster_set_helper.retry_transient(plex_poster_set_helper.fetch_page, fixture_server + "/set/down", default=plex_poster_set_helper.ParseError)
+    assert len(FixtureHandler.requests) == 2   # the first try and one session retry, not again per error_retries
+    plex_poster_set_helper.close_http_session()
+
+class FakeTarget:
+    _server = FakeServer()
+
+    def __init__(self, ratingKey, resources=()):
+        self.ratingKey = ratingKey
+        self.uploads = []
+        self.resources = list(resources)
+
+    def posters(self):
+        return self.resources
+
+    def arts(self):
+        return []
+
+    def uploadPoster(self, url=None, filepath=None):
+        self.uploads.append(("poster", url or filepath))
+
+    def uploadArt(self, url=None, filepath=None):
+        self.uploads.append(("art", url or filepath))
+
+def test_upload_ledger_skips_applied_art(tmp_path, monkeypatch):
+    ledger = plex_poster_set_helper.UploadLedger(str(tmp_path / "uploads.sqlite3"))
+    monkeypatch.setattr(plex_poster_set_helper, "upload_ledger", ledger)
+    target = FakeTarget(1)
+    poster = PosterRecord(TargetKind.MOVIE, "Alien", "https://mediux.pro/a.jpg", "mediux", year=1979)
+
+    assert plex_poster_set_helper.apply_upload(target, poster)
+    assert not plex_poster_set_helper.apply_upload(target, poster)
+    assert plex_poster_set_helper.apply_upload(target, poster, art=True)
+    assert plex_poster_set_helper.apply_upload(target, PosterRecord(TargetKind.MOVIE, "Alien", "https://mediux.pro/b.jpg", "mediux", year=1979))
+    assert plex_poster_set_helper.apply_upload(FakeTarget(2), poster)
+    assert target.uploads == [("poster", "https://mediux.pro/a.jpg"), ("art", "https://mediux.pro/a.jpg"), ("poster", "https://mediux.pro/b.jpg")]
+
+class FakeResource:
+    def __init__(self, ratingKey, selected=False):
+        self.ratingKey = ratingKey
+        self.key = "/library/metadata/1/file?url=" + ratingKey
+        self.selected = selected
+
+    def select(self):
+        self.selected = True
+
+def test_upload_ledger_reselects_art_of_overlapping_sets(tmp_path, monkeypatch, config):
+    config.update({"skip_existing_art": False, "image_cache": {"enabled": False}})
+    monkeypatch.setattr(plex_poster_set_helper, "upload_ledger", plex_poster_set_helper.UploadLedger(str(tmp_path / "uploads.sqlite3")))
+    monkeypatch.setattr(plex_poster_set_helper, "image_cache", None)
+
+    class PlexResource(FakeResource):
+        def __init__(self, target, ratingKey):
+            super().__init__(ratingKey)
+            self.target = target
+
+        def select(self):
+            for resource in self.target.resources:
+                resource.selected = False
+            self.selected = True
+
+    class PlexTarget(FakeTarget):
+        def uploadPoster(self, url=None, filepath=None):
+            super().uploadPoster(url, filepath)
+            self.resources.append(PlexResource(self, url))
+            self.resources[-1].select()
+
+    target = PlexTarget(1)
+    first, second = (PosterRecord(TargetKind.SHOW_COVER, "Futurama", f"https://mediux.pro/{name}.jpg", "mediux") for name in ("a", "b"))
+    # the same bulk file, listing two sets for the same show, run three times
+    for _ in range(3):
+        plex_poster_set_helper.apply_upload(target, first)
+        plex_poster_set_helper.apply_upload(target, second)
+        assert [resource.ratingKey for resource in target.resources if resource.selected] == [second.url]
+    assert target.uploads == [("poster", first.url), ("poster", second.url)]
+
+def test_existing_plex_art_is_selected_not_uploaded(fixture_server, tmp_path, monkeypatch, config):
+    monkeypatch.setattr(plex_poster_set_helper, "upload_ledger", None)
+    monkeypatch.setattr(plex_poster_set_helper, "image_cache", None)
+    config.update({"upload_ledger": {"enabled": False}})
+    FixtureHandler.pages["/a.jpg"] = ("image-a", '"a"')
+    FixtureHandler.pages["/b.jpg"] = ("image-b", '"b"')
+    existing = FakeResource("upload://posters/" + hashlib.sha1(b"image-a").hexdigest())
+    target = FakeTarget(1, [FakeResource("metadata://posters/agent", selected=True), existing])
+
+    # without the image cache, nothing is downloaded just to compare it
+    assert plex_poster_set_helper.apply_upload(target, PosterRecord(TargetKind.MOVIE, "Alien", fixture_server + "/a.jpg", "mediux"))
+    assert FixtureHandler.requests == []
+
+    # with it, the cached bytes are compared with Plex's uploads
+    config.update({"image_cache": {"enabled": True, "path": str(tmp_path / "images")}})
+    target = FakeTarget(1, [FakeResource("metadata://posters/agent", selected=True), existing])
+    try:
+        assert not plex_poster_set_helper.apply_upload(target, PosterRecord(TargetKind.MOVIE, "Alien", fixture_server + "/a.jpg", "mediux"))
+        assert existing.selected
+        assert plex_poster_set_helper.apply_upload(target, PosterRecord(TargetKind.MOVIE, "Alien", fixture_server + "/b.jpg", "mediux"))
+    finally:
+        plex_poster_set_helper.close_image_cache()
+    assert len(target.uploads) == 1 and target.uploads[0][1].endswith(hashlib.sha1(b"image-b").hexdigest())
+
+def test_image_cache_uploads_each_image_once(fixture_server, tmp_path, monkeypatch, config):
+    config.update({"upload_ledger": {"enabled": False}, "skip_existing_art": False, "image_cache": {"enabled": True, "path": str(tmp_path / "images")}})
+    monkeypatch.setattr(plex_poster_set_helper, "upload_ledger", None)
+    monkeypatch.setattr(plex_poster_set_helper, "image_cache", None)
+    FixtureHandler.pages["/a.jpg"] = ("image-a", '"a"')
+    poster = PosterRecord(TargetKind.SHOW_COVER, "Archer", fixture_server + "/a.jpg", "mediux")
+    digest = hashlib.sha1(b"image-a").hexdigest()
+
+    # the same show in two libraries, then again in a later run
+    targets = [FakeTarget(1), FakeTarget(2)]
+    for target in targets:
+        assert plex_poster_set_helper.apply_upload(target, poster)
+    plex_poster_set_helper.close_image_cache()
+    targets.append(FakeTarget(3))
+    assert plex_poster_set_helper.apply_upload(targets[-1], poster)
+    plex_poster_set_helper.close_image_cache()
+
+    image_path = str(tmp_path / "images" / digest[:2] / digest)
+    assert [target.uploads for target in targets] == [[("poster", image_path)]] * 3
+    assert open(image_path, "rb").read() == b"image-a"
+    assert len(FixtureHandler.requests) == 1
+
+class FakeImageCache:
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self, url):
+        return self.path
+
+def test_image_processing_resizes_per_kind(tmp_path, config):
+    config.update({"image_processing": {"enabled": True, "workers": 1, "max_size": {"title_card": [640, 360]}}})
+    source = tmp_path / "source"
+    Image.new("RGBA", (3840, 2160), (200, 30, 30, 255)).save(source, format="PNG")
+    small = tmp_path / "small"
+    Image.new("RGB", (500, 750)).save(small, format="JPEG")
+
+    try:
+        backdrop = plex_poster_set_helper.prepare_image(FakeImageCache(str(source)), PosterRecord(TargetKind.BACKDROP, "Archer", "b", "mediux"))
+        title_card = plex_poster_set_helper.prepare_image(FakeImageCache(str(source)), PosterRecord(TargetKind.TITLE_CARD, "Archer", "t", "mediux", season=1, episode=1))
+        poster = plex_poster_set_helper.prepare_image(FakeImageCache(str(small)), PosterRecord(TargetKind.MOVIE, "Alien", "p", "mediux"))
+    finally:
+        plex_poster_set_helper.close_image_pool()
+
+    with Image.open(backdrop) as image:
+        assert (image.format, image.size) == ("JPEG", (1920, 1080))
+    with Image.open(title_card) as image:
+        assert image.size == (640, 360)
+    assert poster == str(small)   # already small enough, uploaded as-is
+
+def posterdb_page(posters, count=None):
+    cards = "".join(f'''
+        <div class="col-6 col-lg-2 p-1">
+            <a class="text-white" data-toggle="tooltip" data-placement="top" title="Show"></a>
+            <div class="overlay" data-poster-id="{poster_id}"></div>
+            <p class="p-0 mb-1 text-break">{title}</p>
+        </div>''' for poster_id, title in posters)
+    count_span = f'<span class="numCount" data-count="{count}"></span>' if count else ""
+    return f'<html><body>{count_span}<div class="row d-flex flex-wrap m-0 w-100 mx-n1 mt-n1">{cards}</div></body></html>'
+
+def test_scrape_user_pages_fetches_all_pages(fixture_server, monkeypatch, config):
+    monkeypatch.setattr(plex_poster_set_helper, "page_cache", None)
+    config.update({"page_cache": {"enabled": False}})
+    FixtureHandler.pages["/user/fixture"] = (posterdb_page([], count=50), '"u"')
+    FixtureHandler.pages["/user/fixture?section=uploads&page=1"] = (posterdb_page([("1", "Archer (2009)"), ("2", "Archer (2009) - Season 1")]), '"p1"')
+    FixtureHandler.pages["/user/fixture?section=uploads&page=2"] = (posterdb_page([("2", "Archer (2009) - Season 1"), ("3", "Futurama (1999)")]), '"p2"')
+    FixtureHandler.pages["/user/fixture?section=uploads&page=3"] = (posterdb_page([("4", "Futurama (1999) - Specials")]), '"p3"')
+
+    movieposters, showposters, collectionposters = plex_poster_set_helper.run_async(plex_poster_set_helper.scrape_user_pages_async(fixture_server + "/user/fixture"))
+    assert movieposters == [] and collectionposters == []
+    assert [(poster.title, poster.season) for poster in showposters] == [("Archer", None), ("Archer", 1), ("Futurama", None), ("Futurama", 0)]
+
+def test_scrape_user_pages_keeps_pages_that_succeed(fixture_server, monkeypatch, config):
+    monkeypatch.setattr(plex_poster_set_helper, "page_cache", None)
+    config.update({"page_cache": {"enabled": False}})
+    FixtureHandler.pages["/user/fixture"] = (posterdb_page([], count=120), '"u"')
+    for page in range(1, 6):
+        FixtureHandler.pages[f"/user/fixture?section=uploads&page={page}"] = (posterdb_page([(str(page), f"Show {page} (2000)")]), f'"p{page}"')
+    cook_soup = plex_poster_set_helper.cook_soup
+
+    def failing_cook_soup(url, parse_only=None):
+        if url.endswith("page=3"):
+            raise plex_poster_set_helper.NotFoundError(f"{url} was not found")
+        return cook_soup(url, parse_only=parse_only)
+
+    monkeypatch.setattr(plex_poster_set_helper, "cook_soup", failing_cook_soup)
+    plex_poster_set_helper.run_errors.clear()
+
+    movieposters, showposters, collectionposters = plex_poster_set_helper.run_async(plex_poster_set_helper.scrape_user_pages_async(fixture_server + "/user/fixture"))
+    assert [poster.title for poster in showposters] == ["Show 1", "Show 2", "Show 4", "Show 5"]
+    assert [(kind, subject) for kind, subject, _ in plex_poster_set_helper.run_errors.errors] == [("not-found", fixture_server + "/user/fixture?section=uploads&page=3")]
+
+def test_bulk_pipeline_uploads_every_scraped_poster(monkeypatch, config):
+    uploaded = []
+    sets = {
+        f"https://mediux.pro/sets/{n}": ([], [PosterRecord(TargetKind.SEASON_COVER, f"Show {n}", f"{n}/{season}", "mediux", year=2000, season=season) for season in range(1, 11)], [])
+        for n in range(10)
+    }
+    config.update({"bulk_dedupe": False, "pipeline_queue_size": 2, "upload_workers": 2})
+    monkeypatch.setattr(plex_poster_set_helper, "scrape", lambda url: sets[url])
+    monkeypatch.setattr(plex_poster_set_helper, "upload_tv_poster", lambda poster, tv: uploaded.append((poster.title, poster.season)))
+
+    plex_poster_set_helper.run_bulk_pipeline(list(sets), tv=[], movies=[])
+    assert sorted(uploaded) == sorted((f"Show {n}", season) for n in range(10) for season in range(1, 11))
+
+def test_bulk_checkpoint_resume(tmp_path, monkeypatch, config):
+    uploaded = []
+    sets = {
+        f"https://mediux.pro/sets/{n}": ([], [PosterRecord(TargetKind.SEASON_COVER, f"Show {n}", f"{n}/{season}", "mediux", year=2000, season=season) for season in range(1, 4)], [])
+        for n in range(3)
+    }
+    interrupted = {"https://mediux.pro/sets/1"}
+
+    def upload(poster, tv):
+        if poster.url.split("/")[0] in {url.rsplit("/", 1)[1] for url in interrupted} and poster.season == 3:
+            return False
+        uploaded.append(poster.url)
+        return True
+
+    config.update({"bulk_dedupe": False, "upload_workers": 2})
+    monkeypatch.setattr(plex_poster_set_helper, "scrape", lambda url: sets[url])
+    monkeypatch.setattr(plex_poster_set_helper, "upload_tv_poster", upload)
+    path = tmp_path / "checkpoint.jsonl"
+
+    checkpoint = plex_poster_set_helper.BulkCheckpoint(str(path), "bulk.txt")
+    plex_poster_set_helper.run_bulk_pipeline(list(sets), tv=[], movies=[], checkpoint=checkpoint)
+    checkpoint.close()
+    assert len(uploaded) == 8
+
+    # only the failed poster of the unfinished URL is uploaded again
+    interrupted.clear()
+    uploaded.clear()
+    checkpoint = plex_poster_set_helper.BulkCheckpoint(str(path), "bulk.txt", resume=True)
+    assert checkpoint.is_url_done("https://mediux.pro/sets/0") and not checkpoint.is_url_done("https://mediux.pro/sets/1")
+    plex_poster_set_helper.run_bulk_pipeline(list(sets), tv=[], movies=[], checkpoint=checkpoint)
+    checkpoint.close()
+    assert uploaded == ["1/3"]
+
+    # a checkpoint for another bulk file is not resumed
+    checkpoint = plex_poster_set_helper.BulkCheckpoint(str(path), "other.txt", resume=True)
+    assert not checkpoint.is_url_done("https://mediux.pro/sets/0")
+    checkpoint.close()
+
+def test_bulk_errors_are_collected_not_fatal(monkeypatch, config):
+    attempts = []
+    uploaded = []
+
+    def scrape(url):
+        attempts.append(url)
+        if url == "https://theposterdb.com/set/flaky" and attempts.count(url) == 1:
+            raise requests.ConnectionError("connection reset")
+        if url == "https://theposterdb.com/set/missing":
+            raise plex_poster_set_helper.NotFoundError("Poster set not found.")
+        if url == "https://theposterdb.com/set/broken":
+            raise AttributeError("'NoneType' object has no attribute 'find_all'")
+        return [PosterRecord(TargetKind.MOVIE, url.rsplit("/", 1)[1], url, "posterdb", year=2000)], [], []
+
+    def apply_upload(movie, poster, art=False):
+        if poster.title == "rejected":
+            raise plexapi.exceptions.BadRequest("(400) bad_request")
+        uploaded.append(poster.title)
+        return True
+
+    movie = FakeItem("Any", 2000)
+    movie.librarySectionTitle = "Movies"
+    config.update({"bulk_dedupe": False})
+    monkeypatch.setattr(plex_poster_set_helper.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(plex_poster_set_helper, "scrape", scrape)
+    monkeypatch.setattr(plex_poster_set_helper, "find_in_library", lambda library, poster: [movie])
+    monkeypatch.setattr(plex_poster_set_helper, "apply_upload", apply_upload)
+
+    plex_poster_set_helper.run_errors.clear()
+    urls = [f"https://theposterdb.com/set/{name}" for name in ("missing", "flaky", "broken", "rejected", "good")]
+    plex_poster_set_helper.run_bulk_pipeline(urls, tv=[], movies=[])
+
+    assert sorted(uploaded) == ["flaky", "good"]
+    kinds = sorted(kind for kind, _, _ in plex_poster_set_helper.run_errors.errors)
+    assert kinds == ["not-found", "parse", "upload"]
+    assert attempts.count("https://theposterdb.com/set/missing") == 1   # not-found is not retried
+    assert "3 errors" in plex_poster_set_helper.run_errors.summary()
+
+def mediux_page(set_data):
+    '''Wrap set JSON the way MediUX's Next.js pages embed it in flight chunks.'''
+    chunks = [
+        '0:["$","html",null,{"children":"Set Link"}]\n',
+        '5:["$","$L1a",null,' + json.dumps({"set": set_data}) + ']\n',
+    ]
+    scripts = "".join(f"<script>self.__next_f.push([1,{json.dumps(chunk)}])</script>" for chunk in chunks)
+    return f"<html><head></head><body>{scripts}</body></html>"
+
+MEDIUX_SHOW_SET = {
+    "show": {
+        "name": 'Bob\'s "Burgers" & Co',
+        "first_air_date": "2011-01-09",
+        "seasons": [{"id": "s1", "season_number": 1}, {"id": "s2", "season_number": 2}],
+    },
+    "movie": None,
+    "collection": None,
+    "files": [
+        {"id": "f1", "fileType": "poster", "title": "Show", "show_id": {"id": "1"}, "show_id_backdrop": None, "season_id": None, "episode_id": None, "movie_id": None, "collection_id": None},
+        {"id": "f2", "fileType": "backdrop", "title": "Backdrop", "show_id": None, "show_id_backdrop": {"id": "1"}, "season_id": None, "episode_id": None, "movie_id": None, "collection_id": None},
+        {"id": "f3", "fileType": "poster", "title": "Season 2", "show_id": None, "show_id_backdrop": None, "season_id": {"id": "s2"}, "episode_id": None, "movie_id": None, "collection_id": None},
+        {"id": "f4", "fileType": "title_card", "title": "Show S01 E03", "show_id": None, "show_id_backdrop": None, "season_id": None, "episode_id": {"id": "e3", "season_id": {"season_number": 1}}, "movie_id": None, "collection_id": None},
+    ],
+}
+
+def test_scrape_mediux_flight_payload(monkeypatch):
+    monkeypatch.setattr(plex_poster_set_helper, "get_mediux_filters", lambda: None)
+    page = mediux_page(MEDIUX_SHOW_SET)
+    for source in (page, BeautifulSoup(page, "html.parser")):
+        movieposters, showposters, collectionposters = plex_poster_set_helper.scrape_mediux(source)
+        assert movieposters == [] and collectionposters == []
+        assert {poster.title for poster in showposters} == {'Bob\'s "Burgers" & Co'}
+        assert [(poster.kind, poster.season, poster.episode) for poster in showposters] == [
+            (TargetKind.SHOW_COVER, None, None), (TargetKind.BACKDROP, None, None), (TargetKind.SEASON_COVER, 2, None), (TargetKind.TITLE_CARD, 1, 3),
+        ]
+        assert all(poster.year == 2011 and poster.source == "mediux" for poster in showposters)
+
+def test_scrape_mediux_api_backend(fixture_server, monkeypatch, config):
+    config.update({"mediux_backend": "api", "mediux_api_url": fixture_server, "page_cache": {"enabled": False}})
+    monkeypatch.setattr(plex_poster_set_helper, "page_cache", None)
+    monkeypatch.setattr(plex_poster_set_helper, "get_mediux_filters", lambda: None)
+    FixtureHandler.pages["/items/sets/9242"] = (json.dumps({"data": MEDIUX_SHOW_SET}), '"s"')
+
+    movieposters, showposters, collectionposters = plex_poster_set_helper.scrape("https://mediux.pro/sets/9242")
+    assert len(showposters) == 4
+    assert FixtureHandler.requests[0][0].startswith("/items/sets/9242?fields=")
+
+def test_scrape_mediux_collection_set(monkeypatch):
+    monkeypatch.setattr(plex_poster_set_helper, "get_mediux_filters", lambda: None)
+    movies = [{"id": str(n), "title": f"Alien {n}", "release_date": f"{1978 + n}-05-25"} for n in range(1, 5)]
+    files = [
+        {"id": f"f{movie['id']}", "fileType": "poster", "title": movie["title"], "show_id": None, "show_id_backdrop": None, "season_id": None, "episode_id": None, "movie_id": {"id": movie["id"]}, "collection_id": None}
+        for movie in reversed(movies)
+    ]
+    files.append({"id": "fc", "fileType": "poster", "title": "Alien Collection", "show_id": None, "show_id_backdrop": None, "season_id": None, "episode_id": None, "movie_id": None, "collection_id": {"id": "c"}})
+    set_data = {"show": None, "movie": None, "collection": {"collection_name": "Alien Collection", "movies": movies}, "files": files}
+
+    movieposters, showposters, collectionposters = plex_poster_set_helper.scrape_mediux_set({"set": set_data})
+    assert showposters == []
+    assert [(poster.title, poster.year) for poster in movieposters] == [(f"Alien {n}", 1978 + n) for n in range(4, 0, -1)]
+    assert [poster.title for poster in collectionposters] == ["Alien Collection"]
+
+def test_scrape_mediux_quality_per_kind(monkeypatch, config):
+    config.update({"mediux_quality": {"title_card": {"width": 1280}, "background": {"width": 1920, "quality": 70}}})
+    monkeypatch.setattr(plex_poster_set_helper, "get_mediux_filters", lambda: None)
+
+    _, showposters, _ = plex_poster_set_helper.scrape_mediux_set({"set": MEDIUX_SHOW_SET})
+    assert {poster.kind: poster.url.split("&", 1)[1] for poster in showposters} == {
+        TargetKind.SHOW_COVER: "w=3840&q=80",
+        TargetKind.BACKDROP: "w=1920&q=70",
+        TargetKind.SEASON_COVER: "w=3840&q=80",
+        TargetKind.TITLE_CARD: "w=1280&q=80",
+    }
+
+def test_poster_records_dedupe_and_describe():
+    card = PosterRecord(TargetKind.TITLE_CARD, "Futurama", "https://mediux.pro/1", "mediux", year=1999, season=2, episode=5)
+    same = PosterRecord(TargetKind.TITLE_CARD, "Futurama", "https://mediux.pro/1", "mediux", year=1999, season=2, episode=5)
+    other = PosterRecord(TargetKind.TITLE_CARD, "Futurama", "https://mediux.pro/2", "mediux", year=1999, season=2, episode=5)
+    assert plex_poster_set_helper.dedupe_posters([card, same, other]) == [card, other]
+    assert card.target == other.target
+    # records the library index resolves to the same item are never uploaded concurrently
+    mediux = PosterRecord(TargetKind.SHOW_COVER, "Mr. & Mrs. Smith", "a", "mediux", year=2024)
+    posterdb = PosterRecord(TargetKind.SHOW_COVER, "Mr and Mrs Smith", "b", "posterdb")
+    assert mediux.upload_key == posterdb.upload_key
+    assert card.describe() == "art for Futurama - Season 2 Episode 5"
+    assert PosterRecord(TargetKind.SEASON_COVER, "Futurama", "u", "posterdb", season=0).describe() == "art for Futurama - Specials"
+    assert PosterRecord(TargetKind.BACKDROP, "Futurama", "u", "mediux").describe() == "background art for Futurama"
+
+def test_plan_uploads_keeps_one_poster_per_target():
+    def season(source, url, number):
+        return PosterRecord(TargetKind.SEASON_COVER, "Archer", url, source, year=2009, season=number)
+
+    first_set = [season("posterdb", "a1", 1), season("posterdb", "a2", 2)]
+    second_set = [season("mediux", "b1", 1), season("mediux", "b3", 3)]
+
+    planned = plex_poster_set_helper.plan_uploads([first_set, second_set])
+    assert sorted(poster.url for poster in planned) == ["a2", "b1", "b3"]
+
+    planned = plex_poster_set_helper.plan_uploads([second_set, first_set])
+    assert sorted(poster.url for poster in planned) == ["a1", "a2", "b3"]
+
+    planned = plex_poster_set_helper.plan_uploads([second_set, first_set], source_priority=["mediux", "posterdb"])
+    assert sorted(poster.url for poster in planned) == ["a2", "b1", "b3"]
+
+    # titles that differ only in punctuation, or lack the year, are still the same target
+    dated = PosterRecord(TargetKind.MOVIE, "Mr. & Mrs. Smith", "m", "mediux", year=2005)
+    undated = PosterRecord(TargetKind.MOVIE, "Mr and Mrs Smith", "p", "posterdb")
+    assert plex_poster_set_helper.plan_uploads([[dated], [undated]]) == [undated]
+    other_year = PosterRecord(TargetKind.MOVIE, "Mr. & Mrs. Smith", "o", "mediux", year=1941)
+    assert len(plex_poster_set_helper.plan_uploads([[dated], [other_year]])) == 2
+
+class FakeMovie(FakeTarget):
+    librarySectionTitle = "Movies"
+
+    def __init__(self, ratingKey, title, year):
+        super().__init__(ratingKey)
+        self.title = title
+        self.year = year
+
+def test_plan_and_apply(tmp_path, monkeypatch, config):
+    config.update({"upload_ledger": {"enabled": False}, "skip_existing_art": False})
+    monkeypatch.setattr(plex_poster_set_helper, "upload_ledger", None)
+    plex_poster_set_helper.reset_library_indexes()
+    alien = FakeMovie(7, "Alien", 1979)
+    section = FakeSection([alien])
+    sets = {
+        "https://mediux.pro/sets/1": ([PosterRecord(TargetKind.MOVIE, "Alien", "https://mediux.pro/alien.jpg", "mediux", year=1979),
+                                       PosterRecord(TargetKind.MOVIE, "Aliens", "https://mediux.pro/aliens.jpg", "mediux", year=1986)], [], []),
+    }
+    monkeypatch.setattr(plex_poster_set_helper, "scrape", lambda url: sets[url])
+    bulk_file = tmp_path / "bulk.txt"
+    bulk_file.write_text("# comment\nhttps://mediux.pro/sets/1\n")
+    plan_file = tmp_path / "plan.jsonl"
+
+    plex_poster_set_helper.write_plan(str(bulk_file), str(plan_file), tv=[], movies=[section])
+    entries = [json.loads(line) for line in plan_file.read_text().splitlines()]
+    assert [(entry["title"], entry["rating_key"], entry["kind"]) for entry in entries] == [("Alien", "7", "movie"), ("Aliens", None, "movie")]
+    assert alien.uploads == []
+
+    class FakePlex:
+        machineIdentifier = FakeServer.machineIdentifier
+
+        def fetchItem(self, ratingKey):
+            if ratingKey != 7:
+                raise plexapi.exceptions.NotFound(f"item {ratingKey} not found")
+            return alien
+
+    # an item deleted from Plex since the plan was written is reported, not fatal
+    with open(plan_file, "a", encoding="utf-8") as plan:
+        plan.write(json.dumps(dict(entries[0], title="Alien 3", rating_key="8")) + "\n")
+    plex_poster_set_helper.apply_plan(str(plan_file), [FakePlex()])
+    assert alien.uploads == [("poster", "https://mediux.pro/alien.jpg")]
+    assert [(kind, subject) for kind, subject, _ in plex_poster_set_helper.run_errors.errors] == [("not-found", "Alien 3 (Movies)")]
+
+def test_bulk_run_fans_out_to_every_server(monkeypatch, config):
+    config.update({"upload_ledger": {"enabled": False}, "skip_existing_art": False})
+    monkeypatch.setattr(plex_poster_set_helper, "upload_ledger", None)
+    monkeypatch.setattr(plex_poster_set_helper, "server_upload_workers", {"server-a": 1, "server-b": 3})
+    plex_poster_set_helper.reset_library_indexes()
+    movies, sections = [], []
+    for name in ("server-a", "server-b"):
+        server = FakeServer()
+        server.machineIdentifier = name
+        movie = FakeMovie(7, "Alien", 1979)
+        movie._server = server
+        section = FakeSection([movie])
+        section._server = server
+        movies.append(movie)
+        sections.append(section)
+    scraped = []
+    poster = PosterRecord(TargetKind.MOVIE, "Alien", "https://mediux.pro/alien.jpg", "mediux", year=1979)
+    monkeypatch.setattr(plex_poster_set_helper, "scrape", lambda url: scraped.append(url) or ([poster], [], []))
+
+    plex_poster_set_helper.run_bulk_pipeline(["https://mediux.pro/sets/1"], tv=[], movies=sections)
+    assert scraped == ["https://mediux.pro/sets/1"]   # scraped once for both servers
+    assert [movie.uploads for movie in movies] == [[("poster", poster.url)]] * 2
+
+    fan_out = plex_poster_set_helper.PosterUploader([], sections)
+    assert [(server_movies, uploader.running._value) for uploader, _, server_movies in fan_out.servers] == [([sections[0]], 1), ([sections[1]], 3)]
+
+def test_slow_server_does_not_hold_back_the_others(monkeypatch):
+    monkeypatch.setattr(plex_poster_set_helper, "server_upload_workers", {"server-a": 1, "server-b": 1})
+    sections = []
+    for name in ("server-a", "server-b"):
+        section = FakeSection([])
+        section._server = FakeServer()
+        section._server.machineIdentifier = name
+        sections.append(section)
+    release = threading.Event()
+    uploaded = {"server-a": [], "server-b": []}
+
+    def upload_poster(poster, tv, movies):
+        server_id = movies[0]._server.machineIdentifier
+        if server_id == "server-a":
+            release.wait(5)
+        uploaded[server_id].append(poster.title)
+        return True
+
+    monkeypatch.setattr(plex_poster_set_helper, "upload_poster", upload_poster)
+    posters = [PosterRecord(TargetKind.MOVIE, title, "", "mediux") for title in ("Alien", "Aliens", "Alien 3")]
+
+    async def upload():
+        async with plex_poster_set_helper.PosterUploader([], sections, max_pending=1) as uploader:
+            for poster in posters:
+                await asyncio.wait_for(uploader.submit(poster), 5)
+            for _ in range(500):
+                if len(uploaded["server-b"]) == 3:
+                    break
+                await asyncio.sleep(0.01)
+            # server-a is still stuck on its first upload
+            assert uploaded == {"server-a": [], "server-b": ["Alien", "Aliens", "Alien 3"]}
+            release.set()
+
+    try:
+        plex_poster_set_helper.run_async(upload())
+    finally:
+        release.set()
+    assert uploaded["server-a"] == ["Alien", "Aliens", "Alien 3"]
         
 test_scrape_mediux_set_tv_series()
\ No newline at end of file